@@ -1,4 +1,4 @@
 
 __version__ = '1.4.0'
 
-from laika.reports import Config, Runner
+from laika.reports import Config, Runner, ReportNameFilter
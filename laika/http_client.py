@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+
+import requests
+import six
+
+from collections import defaultdict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+DEFAULT_OPTIONS = {
+    'pool_connections': 10,
+    'pool_maxsize': 10,
+    'max_retries': 3,
+    'backoff_factor': 0.5,
+    'timeout': None
+}
+
+
+class RequestMetrics(object):
+    """ Keeps count of requests made and time spent on them, per host. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)
+            self.elapsed = defaultdict(float)
+
+    def record(self, response, *args, **kwargs):
+        """ Response hook that records the time a request took. """
+        host = six.moves.urllib.parse.urlparse(response.url).netloc
+        elapsed = response.elapsed.total_seconds()
+        with self._lock:
+            self.requests[host] += 1
+            self.elapsed[host] += elapsed
+        logging.debug('%s %s: %s in %.2fs', response.request.method, response.url,
+                      response.status_code, elapsed)
+
+    def log_summary(self):
+        for host in sorted(self.requests):
+            logging.info('%s: %d requests in %.1fs', host, self.requests[host],
+                         self.elapsed[host])
+
+
+metrics = RequestMetrics()
+
+
+class Session(requests.Session):
+    """ requests.Session with a default timeout for every request. """
+
+    def __init__(self, timeout=None):
+        super(Session, self).__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super(Session, self).request(method, url, **kwargs)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def create_session(pool_connections, pool_maxsize, max_retries, backoff_factor, timeout):
+    """
+    Creates a session that keeps connections alive in a pool of up to
+    pool_maxsize connections per host, and retries idempotent requests
+    answered with 429 or 5xx statuses up to max_retries times, with
+    exponential backoff (honoring Retry-After headers).
+    """
+    session = Session(timeout)
+    retry = Retry(total=max_retries, backoff_factor=backoff_factor,
+                  status_forcelist=RETRY_STATUS_CODES, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                          max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    session.hooks['response'].append(metrics.record)
+    return session
+
+
+def get_session(host, scope=None, **options):
+    """
+    Returns the session shared by every report requesting a given host with
+    the same scope and options. Options not specified are taken from
+    DEFAULT_OPTIONS.
+
+    Sessions keep cookies, so reports using different credentials must pass
+    different scopes. Sessions are shared, so authentication must be sent with
+    each request instead of being set in the session.
+    """
+    session_options = DEFAULT_OPTIONS.copy()
+    session_options.update(options)
+    unknown = set(session_options) - set(DEFAULT_OPTIONS)
+    if unknown:
+        raise ValueError('Unknown http options: {}'.format(', '.join(sorted(unknown))))
+
+    key = (host, scope, tuple(sorted(session_options.items())))
+    with _sessions_lock:
+        if key not in _sessions:
+            _sessions[key] = create_session(**session_options)
+        return _sessions[key]
+
+
+def close_sessions():
+    """ Closes every shared session, logging how much time requests took. """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+    metrics.log_summary()
+    metrics.reset()
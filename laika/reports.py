@@ -2,27 +2,38 @@
 
 import os
 import imp
-import csv
+import io
+import itertools
 import pytz
 import json
+import random
+import re
 import datetime as dt
 import numpy as np
 import pandas as pd
 import ftplib
+import glob
 import logging
+import mimetypes
 import smtplib
-import requests
+import operator
 import shlex
 import six
 import subprocess
 import tempfile
+import threading
 import time
 
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import closing, contextmanager
 from datetime import datetime
 from dateutil.relativedelta import relativedelta, MO
 from string import Formatter
 from shutil import copyfileobj
 
+from six.moves import cPickle as pickle
+
 from email import encoders
 from email.utils import COMMASPACE
 from email.mime.base import MIMEBase
@@ -30,6 +41,8 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 
+from laika import http_client
+
 
 class ReportError(Exception):
     """ An exception to denote that report generation failed """
@@ -49,6 +62,469 @@ def is_buffer(data):
     return hasattr(data, 'read') and hasattr(data, 'write')
 
 
+_context = threading.local()
+
+
+def current_report():
+    """ Returns the name of the report running in the current thread, if any. """
+    return getattr(_context, 'report', None)
+
+
+@contextmanager
+def report_context(name):
+    """ Marks the current thread as running the given report. """
+    previous = current_report()
+    _context.report = name
+    try:
+        yield
+    finally:
+        _context.report = previous
+
+
+def write_csv(frame, buf, encoding='utf-8', **kwargs):
+    """
+    Writes a DataFrame as csv to a binary buffer. On Python 3 the csv is
+    encoded while it's written, instead of rendering it whole as a string and
+    encoding it afterwards.
+    """
+    if six.PY2:
+        frame.to_csv(buf, encoding=encoding, **kwargs)
+        return
+    wrapper = io.TextIOWrapper(buf, encoding=encoding, newline='')
+    try:
+        frame.to_csv(wrapper, **kwargs)
+        wrapper.flush()
+    finally:
+        wrapper.detach()
+
+
+# to_csv's line_terminator argument was renamed to lineterminator in pandas 1.5
+_line_terminator_arg = ('lineterminator'
+                        if tuple(int(v) for v in pd.__version__.split('.')[:2]) >= (1, 5)
+                        else 'line_terminator')
+
+
+def glob_to_regex(pattern):
+    """
+    Returns a compiled regex for a glob pattern that, like glob.glob, matches
+    paths with * and ? only within a path segment (they don't match /).
+    """
+    parts, i = [], 0
+    while i < len(pattern):
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            # A ] right after [ or [! is part of the set
+            start = i + 1 if pattern[i:i + 1] == '!' else i
+            start += 1 if pattern[start:start + 1] == ']' else 0
+            end = pattern.find(']', start)
+            if end < 0:
+                parts.append(re.escape(c))
+                continue
+            body = pattern[i:end].replace('\\', '\\\\')
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            elif body.startswith('^'):
+                body = '\\' + body
+            parts.append('[' + body + ']')
+            i = end + 1
+        else:
+            parts.append(re.escape(c))
+    return re.compile(''.join(parts) + r'\Z', re.DOTALL)
+
+
+_compressions = {'gz': 'gzip', 'zst': 'zstd'}
+
+
+def split_extension(filename):
+    """
+    Returns the format and the compression of a file given its extensions.
+    For example, ('csv', 'gzip') for data.csv.gz, or ('csv', None) for data.csv.
+    """
+    parts = filename.split('.')
+    compression = _compressions.get(parts[-1]) if len(parts) > 2 else None
+    if compression is not None:
+        parts.pop()
+    return parts[-1], compression
+
+
+@contextmanager
+def compressed_file(path_or_buf, compression, mode, level=None):
+    """
+    Opens a path, or wraps a binary buffer, to read (mode 'rb') or write
+    (mode 'wb') gzip or zstd compressed contents. Passed buffers are not
+    closed.
+    """
+    f = open(path_or_buf, mode) if isinstance(path_or_buf, six.string_types) else None
+    buf = path_or_buf if f is None else f
+    try:
+        if compression == 'gzip':
+            import gzip
+            wrapper = gzip.GzipFile(fileobj=buf, mode=mode,
+                                    compresslevel=9 if level is None else int(level))
+        elif compression == 'zstd':
+            import zstandard
+            if mode == 'rb':
+                wrapper = zstandard.ZstdDecompressor().stream_reader(buf, closefd=False)
+            else:
+                compressor = zstandard.ZstdCompressor(level=3 if level is None else int(level))
+                wrapper = compressor.stream_writer(buf, closefd=False)
+        else:
+            raise ReportError('Unknown compression {}'.format(compression))
+        with wrapper:
+            yield wrapper
+    finally:
+        if f is not None:
+            f.close()
+
+
+class SerializationCache(object):
+    """
+    Keeps the serialized contents of results' data, so that results which
+    write the same data with the same settings render it only once and share
+    the resulting bytes. Entries keep a reference to their data, so its id
+    can't be reused by another object while the cache is alive.
+
+    share gives the cache only to the results that write the same contents as
+    another one, the rest render their data by themselves (and can stream it).
+    Contents are dropped once every result sharing them is released.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._users = {}
+        self._result_keys = {}
+        self._lock = threading.Lock()
+
+    def share(self, results):
+        """
+        Sets the cache as serialization_cache of the file results that
+        serialize the same data with the same settings as another result.
+        """
+        groups = {}
+        for result in results:
+            if isinstance(result, FileResult) and result.can_share_serialization():
+                key = (id(result.data), result.serialization_key())
+                groups.setdefault(key, []).append(result)
+        with self._lock:
+            for key, group in groups.items():
+                if len(group) < 2:
+                    continue
+                self._users[key] = len(group)
+                for result in group:
+                    self._result_keys[id(result)] = key
+                    result.serialization_cache = self
+
+    def release(self, result):
+        """ Drops the contents of a result once no other result needs them. """
+        with self._lock:
+            key = self._result_keys.pop(id(result), None)
+            if key is None:
+                return
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                self._entries.pop(key, None)
+
+    def get(self, data, key, render):
+        """
+        Returns the contents cached for data and key, calling render to
+        create them if they don't exist. Concurrent calls for the same entry
+        wait for a single render.
+        """
+        with self._lock:
+            entry = self._entries.setdefault((id(data), key), [data, threading.Lock(), None])
+        with entry[1]:
+            if entry[2] is None:
+                entry[2] = render()
+            return entry[2]
+
+
+class ChunkedData(object):
+    """
+    Report data produced as a sequence of DataFrames, so results can process
+    it one chunk at a time instead of holding all of it in memory.
+
+    Chunks can be iterated more than once, also at the same time (e.g. by
+    several results): chunks are read from the source once and pickled to a
+    temporary file, which the rest of iterations read them from. The lock is
+    only held to get each chunk, so stopped or abandoned iterations don't
+    block the rest.
+    """
+
+    def __init__(self, chunks):
+        self._source = iter(chunks)
+        self._spool = None
+        self._offsets = []
+        self._lock = threading.Lock()
+
+    def _get_chunk(self, index):
+        """
+        Returns the chunk in the given position, reading it from the source if
+        no iteration got to it yet. Raises StopIteration after the last one.
+        """
+        with self._lock:
+            if self._spool is None:
+                self._spool = tempfile.TemporaryFile()
+            if index < len(self._offsets):
+                self._spool.seek(self._offsets[index])
+                return pickle.load(self._spool)
+
+            chunk = next(self._source)
+            self._spool.seek(0, os.SEEK_END)
+            self._offsets.append(self._spool.tell())
+            pickle.dump(chunk, self._spool, pickle.HIGHEST_PROTOCOL)
+            return chunk
+
+    def __iter__(self):
+        for index in itertools.count():
+            try:
+                chunk = self._get_chunk(index)
+            except StopIteration:
+                return
+            yield chunk
+
+    def to_frame(self):
+        """ Returns all the chunks concatenated in a single DataFrame. """
+        chunks = list(self)
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def as_dataframe(data):
+    """
+    Returns data as a DataFrame, concatenating its chunks if it's ChunkedData,
+    or passing it to DataFrame's constructor otherwise.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, ChunkedData):
+        return data.to_frame()
+    return pd.DataFrame(data)
+
+
+class StreamingBuffer(io.RawIOBase):
+    """
+    Read only binary file-like object over an iterator of bytes chunks, which
+    are consumed as the buffer is read. Read contents are kept in a temporary
+    file, so the buffer can be rewinded and read again (e.g. by several
+    results). Buffers created via fork share the contents, but each one has
+    its own position, so they can be read at the same time.
+    """
+
+    def __init__(self, chunks, _source=None):
+        super(StreamingBuffer, self).__init__()
+        if _source is None:
+            _source = {'chunks': iter(chunks), 'spool': tempfile.TemporaryFile(), 'size': 0,
+                       'lock': threading.Lock()}
+        self._source = _source
+        self._position = 0
+
+    def fork(self):
+        """ Returns a new buffer over the same contents. """
+        return StreamingBuffer(None, _source=self._source)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def _fill(self, size=None):
+        """ Consumes chunks until size bytes are spooled, or all of them. """
+        source = self._source
+        source['spool'].seek(0, os.SEEK_END)
+        while size is None or source['size'] < size:
+            chunk = next(source['chunks'], None)
+            if chunk is None:
+                break
+            source['spool'].write(chunk)
+            source['size'] += len(chunk)
+
+    def readinto(self, b):
+        with self._source['lock']:
+            if self._position + len(b) > self._source['size']:
+                self._fill(self._position + len(b))
+            spool = self._source['spool']
+            spool.seek(self._position)
+            data = spool.read(len(b))
+        b[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_END:
+            with self._source['lock']:
+                self._fill()
+            offset += self._source['size']
+        elif whence == io.SEEK_CUR:
+            offset += self._position
+        self._position = offset
+        return offset
+
+    def tell(self):
+        return self._position
+
+
+class MemoryReader(io.RawIOBase):
+    """
+    Read only binary file-like object over a bytes-like object (like a memory
+    mapped file), that reads slices of it instead of copying the whole
+    contents to a new buffer. Readers created via fork share the contents,
+    but each one has its own position, so they can be read at the same time.
+    Closing the original reader closes the contents (e.g. unmaps the file).
+    """
+
+    def __init__(self, data, _view=None):
+        super(MemoryReader, self).__init__()
+        self._data = data
+        self._owner = _view is None
+        self._view = memoryview(data) if _view is None else _view
+        self._position = 0
+
+    def fork(self):
+        """ Returns a new reader over the same contents. """
+        return MemoryReader(self._data, _view=self._view)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else self._position + size
+        data = self._view[self._position:end].tobytes()
+        self._position += len(data)
+        return data
+
+    def readinto(self, b):
+        data = self._view[self._position:self._position + len(b)]
+        b[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_END:
+            offset += len(self._view)
+        elif whence == io.SEEK_CUR:
+            offset += self._position
+        self._position = offset
+        return offset
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if self._owner and not self.closed:
+            self._view.release()
+            if hasattr(self._data, 'close'):
+                self._data.close()
+        super(MemoryReader, self).close()
+
+
+def map_file(path):
+    """
+    Returns a MemoryReader over the memory mapped contents of a file, which
+    the OS reads as they are accessed, instead of copying them to memory. The
+    file is unmapped when the reader is closed.
+    """
+    with open(path, 'rb') as f:
+        return map_fileobj(f)
+
+
+def map_fileobj(f):
+    """
+    Like map_file, for a file opened in binary mode (like a temporary file).
+    The file can be closed afterwards. Empty files can't be mapped, so a
+    reader over empty contents is returned for them.
+    """
+    import mmap
+    f.flush()
+    if os.fstat(f.fileno()).st_size == 0:
+        return MemoryReader(b'')
+    if six.PY2:
+        # mmap doesn't support memoryview in Python 2
+        f.seek(0)
+        return MemoryReader(f.read())
+    # The mapping stays valid after closing the file
+    return MemoryReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def has_fileno(data):
+    """ Returns true if data is a file with a file descriptor. """
+    try:
+        data.fileno()
+        return True
+    except (AttributeError, io.UnsupportedOperation, ValueError):
+        return False
+
+
+def map_concurrently(func, items, max_workers=1):
+    """
+    Like run_concurrently, but returns the results of the calls in the same
+    order as items, and raises the exception of the first failed call once
+    all the calls finished.
+    """
+    outcomes = run_concurrently(func, items, max_workers)
+    for _, error in outcomes:
+        if error is not None:
+            raise error
+    return [result for result, _ in outcomes]
+
+
+def run_concurrently(func, items, max_workers=1):
+    """
+    Calls func for every item using up to max_workers threads (or in the
+    current thread if max_workers is 1). Returns a list with a tuple of
+    (result, exception) for each item, in the same order as items: exceptions
+    are captured, so a failing call doesn't prevent the rest from running.
+    Calls are made in the context of the current report.
+
+    items can be a lazy iterable: it's consumed as calls finish, so only
+    max_workers items are taken from it at a time.
+    """
+    report = current_report()
+
+    def call(item):
+        with report_context(report):
+            try:
+                return func(item), None
+            except Exception as e:
+                return None, e
+
+    if max_workers <= 1 or (hasattr(items, '__len__') and len(items) <= 1):
+        return [call(item) for item in items]
+
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for index, item in enumerate(items):
+            if len(pending) >= max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcomes[pending.pop(future)] = future.result()
+            pending[executor.submit(call, item)] = index
+        for future in pending:
+            outcomes[pending[future]] = future.result()
+    return [outcomes[index] for index in range(len(outcomes))]
+
+
+class ReportNameFilter(logging.Filter):
+    """
+    Logging filter that sets the name of the report being run by the current
+    thread in the record's report attribute, so it can be used in log formats
+    as %(report)s. Useful to tell apart log lines of concurrent reports.
+    """
+
+    def filter(self, record):
+        record.report = current_report() or '-'
+        return True
+
+
 class BasicReport(object):
     """
     Report base class. All the keyword arguments will be set as object
@@ -234,8 +710,19 @@ class FormattedReport(BasicReport):
 class FileReport(FormattedReport):
     """
     Report that reads from file on path defined by filename parameter.
-    Based on extension of given filename, file is parsed as pandas.DataFrame.
-    If raw parameter is True, reads the file into a buffer without parsing.
+    Based on extension of given filename, file is parsed as pandas.DataFrame
+    (csv, tsv and json files can be compressed, like data.csv.gz or
+    data.csv.zst). Only the given columns are read, and parquet row groups can
+    be skipped with filters.
+    If raw parameter is True, reads the file without parsing it: local files
+    are memory mapped and returned as a read only file-like MemoryReader.
+
+    If filename is a glob pattern (like events/part-*.csv), every matching
+    file modified after modified_since is read, up to max_workers files at a
+    time, in order of their names. The files are concatenated in a single
+    DataFrame or, if stream is True, passed to results as ChunkedData, one
+    chunk per file. The name of the file each row comes from can be saved in
+    source_column.
     """
 
     filename = None
@@ -243,16 +730,21 @@ class FileReport(FormattedReport):
     encoding = 'utf-8'
     extra_args = {}
     converters = {}
+    max_workers = 1
+    stream = False
+    modified_since = None
+    source_column = None
+    columns = None
+    filters = None
+    pattern = None
 
     def __init__(self, *args, **kwargs):
         super(FileReport, self).__init__(*args, **kwargs)
         self.file_formatter = FilenameFormatter(self.conf)
         self.filename = self.file_formatter.format(self.filename)
-        self.extension = self.filename.split('.')[-1]
+        self.extension, self.compression = split_extension(self.filename)
 
     def process_path_or_buff(self, path_or_buf):
-        args = dict(encoding=self.encoding)
-        args.update(self.extra_args)
         if self.raw:
             if is_buffer(path_or_buf):
                 s = six.BytesIO()
@@ -260,38 +752,155 @@ class FileReport(FormattedReport):
                 return s
             else:
                 return path_or_buf
+        if self.compression is not None:
+            with compressed_file(path_or_buf, self.compression, 'rb') as f:
+                return self.parse(f)
+        return self.parse(path_or_buf)
+
+    def parse(self, path_or_buf):
+        """ Parses a file as a DataFrame, based on its extension. """
+        args = dict(encoding=self.encoding)
+        args.update(self.extra_args)
         if self.extension in {'json'}:
-            return pd.read_json(path_or_buf, **args)
+            data = pd.read_json(path_or_buf, **args)
+            return data[self.columns] if self.columns else data
         elif self.extension in {'csv'}:
-            return pd.read_csv(path_or_buf, **args)
+            return pd.read_csv(path_or_buf, usecols=self.columns, **args)
         elif self.extension in {'tsv'}:
-            return pd.read_csv(path_or_buf, sep='\t', **args)
+            return pd.read_csv(path_or_buf, sep='\t', usecols=self.columns, **args)
         elif self.extension in {'xls', 'xlsx', 'xlsm'}:
             args['converters'] = {k: eval(v) for k, v in self.converters.items()}
-            return pd.read_excel(path_or_buf, **args)
+            return pd.read_excel(path_or_buf, usecols=self.columns, **args)
+        elif self.extension in {'parquet'}:
+            return pd.read_parquet(path_or_buf, columns=self.columns, filters=self.filters,
+                                   **self.extra_args)
+        elif self.extension in {'feather', 'arrow'}:
+            return pd.read_feather(path_or_buf, columns=self.columns, **self.extra_args)
         else:
             raise ReportError('Unknown file type! Please, use raw = True.')
 
+    def is_pattern(self):
+        """
+        Returns True if filename is a glob pattern instead of a single file.
+        Unless pattern is set, filenames with wildcards are only treated as
+        patterns if no file has that literal name (like report[1].csv).
+        """
+        if self.pattern is not None:
+            return bool(self.pattern)
+        return any(c in self.filename for c in '*?[') and not self.exists(self.filename)
+
+    def exists(self, filename):
+        return os.path.exists(filename)
+
+    def get_modified_since(self):
+        """ Returns modified_since as a timezone aware Timestamp, or None. """
+        if not self.modified_since:
+            return None
+        since = pd.Timestamp(self.formatter.format(self.modified_since))
+        if since.tzinfo is None:
+            since = since.tz_localize(self.formatter.get_now().tzinfo.zone)
+        return since
+
+    def list_parts(self):
+        """ Returns the sorted paths of the files matching filename pattern. """
+        since = self.get_modified_since()
+        return [path for path in sorted(glob.glob(self.filename))
+                if since is None or
+                pd.Timestamp(os.path.getmtime(path), unit='s', tz='UTC') >= since]
+
+    def read_part(self, path):
+        # pandas reads paths with its own (native) readers. Raw files are
+        # memory mapped instead of copied.
+        if self.raw:
+            return map_file(path)
+        return self.process_path_or_buff(path)
+
+    def read_parts(self, parts):
+        """
+        Yields the DataFrame of each part, reading up to max_workers parts at
+        a time, so only that many parts are held in memory when streaming.
+        """
+        def read(part):
+            frame = self.read_part(part)
+            if self.source_column:
+                frame[self.source_column] = part
+            return frame
+
+        workers = max(int(self.max_workers), 1)
+        for i in range(0, len(parts), workers):
+            for frame in map_concurrently(read, parts[i:i + workers], workers):
+                yield frame
+
+    def process_parts(self):
+        if self.raw:
+            raise ReportError('Raw files can\'t be read from a pattern, it must be a single file')
+        parts = self.list_parts()
+        if not parts:
+            raise ReportError('No files match {}'.format(self.filename))
+        logging.info('Reading %d parts: %s', len(parts), ', '.join(parts))
+
+        if self.stream:
+            return ChunkedData(self.read_parts(parts))
+        return pd.concat(list(self.read_parts(parts)), ignore_index=True, sort=False)
+
     def process(self):
-        with open(self.filename) as f:
-            return self.process_path_or_buff(f)
+        if self.is_pattern():
+            return self.process_parts()
+        return self.read_part(self.filename)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+# Connection fields passed to sqlalchemy's create_engine
+_engine_options = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping')
+
+
+def get_engine(conf, connection):
+    """
+    Returns the sqlalchemy engine for a given connection name. Engines are
+    created once and shared by every report using the connection (and its
+    pool of connections), until dispose_engines is called.
+    """
+    from sqlalchemy import create_engine
+    connection_conf = conf['connections'][connection]
+    constring = connection_conf['constring']
+    options = {k: connection_conf[k] for k in _engine_options if k in connection_conf}
+    key = (connection, constring, tuple(sorted(options.items())))
+    with _engines_lock:
+        if key not in _engines:
+            logging.info('Connecting to %s', connection)
+            _engines[key] = create_engine(constring, **options)
+        return _engines[key]
+
+
+def dispose_engines():
+    """ Closes the connections of every shared engine and forgets them. """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
 
 
 class QueryReport(FormattedReport):
     """
     Makes a query to a given sqlalchemy connection.
     The query is supposed to be a sql that the connection understands.
+
+    If chunksize is set or stream is True, the query is executed with a
+    server side cursor and the result is returned as ChunkedData, holding only
+    chunksize rows in memory at a time.
     """
 
+    chunksize = None
+    stream = False
+    default_chunksize = 50000
+
     def __init__(self, *args, **kwargs):
         self.query_file = None
         self.query = None
         super(QueryReport, self).__init__(*args, **kwargs)
-
-        from sqlalchemy import create_engine
-        logging.info('Connecting to %s', self.connection)
-        constring = self.conf['connections'][self.connection]['constring']
-        self.engine = create_engine(constring)
+        self.engine = get_engine(self.conf, self.connection)
 
     def process(self):
         query = None
@@ -301,22 +910,187 @@ class QueryReport(FormattedReport):
             with open(self.query_file) as f:
                 logging.info('Executing query from %s', self.query_file)
                 query = self.formatter.format(f.read())
+        if self.chunksize or self.stream:
+            return ChunkedData(self.read_chunks(query))
         df = pd.read_sql_query(query, con=self.engine)
         return df
 
+    def read_chunks(self, query):
+        """ Yields the query result in DataFrames of chunksize rows. """
+        chunksize = int(self.chunksize or self.default_chunksize)
+        logging.info('Streaming query results in chunks of %d rows', chunksize)
+        connection = self.engine.connect().execution_options(stream_results=True)
+        try:
+            for chunk in pd.read_sql_query(query, con=connection, chunksize=chunksize):
+                yield chunk
+        finally:
+            connection.close()
+
+
+class RateLimiter(object):
+    """
+    Spaces calls shared between threads, so that at most rate of them start
+    every second. When the called service is overloaded, penalize halves the
+    rate (down to min_rate), and every successful call recovers a tenth of
+    the initial rate.
+    """
+
+    def __init__(self, rate, min_rate=0.5):
+        self.max_rate = self.rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ Waits until the next call can be made. """
+        with self._lock:
+            now = time.time()
+            wait = self._next - now
+            self._next = max(now, self._next) + 1 / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self):
+        with self._lock:
+            self.rate = max(self.rate / 2, self.min_rate)
+            logging.info('Limiting calls to %.1f per second', self.rate)
+
+    def reward(self):
+        with self._lock:
+            self.rate = min(self.rate + self.max_rate / 10, self.max_rate)
+
+
+class Poller(object):
+    """
+    Polls an asynchronous job until it finishes, waiting between checks with
+    jittered exponential backoff: from initial_delay, multiplied by backoff on
+    each check, up to max_delay.
+
+    check must be a callable that returns a tuple of (done, progress), where
+    progress is the completion percentage of the job, or None if it's unknown.
+    When progress is known, the time left is estimated from the progress rate,
+    and the job is checked again when it's expected to finish (within
+    initial_delay and max_delay).
+
+    Raises ReportError if the job isn't done after timeout seconds or after
+    max_polls checks. Number of checks and time spent waiting are kept in
+    polls and waited attributes.
+    """
+
+    def __init__(self, name='job', initial_delay=1, max_delay=60, backoff=2, jitter=0.1,
+                 timeout=None, max_polls=None):
+        self.name = name
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self.max_polls = max_polls
+        self.polls = 0
+        self.waited = 0
+
+    def next_delay(self, delay, elapsed, progress):
+        """ Returns seconds to wait before the next check. """
+        if progress:
+            remaining = elapsed * (100. - progress) / progress
+            delay = min(max(remaining, self.initial_delay), self.max_delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def poll(self, check):
+        start, delay = time.time(), self.initial_delay
+        while True:
+            self.polls += 1
+            done, progress = check()
+            elapsed = time.time() - start
+            if done:
+                logging.info('%s finished after %.1fs: %d checks, %.1fs waiting',
+                             self.name, elapsed, self.polls, self.waited)
+                return
+
+            if self.max_polls is not None and self.polls >= self.max_polls:
+                raise ReportError('{} not finished after {} checks'.format(self.name, self.polls))
+            if self.timeout is not None and elapsed >= self.timeout:
+                raise ReportError('{} not finished after {:.0f}s'.format(self.name, elapsed))
+
+            wait = self.next_delay(delay, elapsed, progress)
+            if self.timeout is not None:
+                wait = min(wait, self.timeout - elapsed)
+            logging.debug('%s not finished (progress: %s), next check in %.1fs',
+                          self.name, progress, wait)
+            time.sleep(wait)
+            self.waited += wait
+            delay = min(delay * self.backoff, self.max_delay)
+
+
+class PollingMixin(object):
+    """
+    Polling configuration for reports that wait for asynchronous jobs. See
+    Poller for the meaning of each parameter.
+    """
+    poll_initial_delay = 1
+    poll_max_delay = 60
+    poll_backoff = 2
+    poll_jitter = 0.1
+    poll_timeout = None
+
+    def create_poller(self, name, **kwargs):
+        args = dict(initial_delay=self.poll_initial_delay, max_delay=self.poll_max_delay,
+                    backoff=self.poll_backoff, jitter=self.poll_jitter,
+                    timeout=self.poll_timeout)
+        args.update(kwargs)
+        return Poller(name, **args)
+
+
+class HTTPMixin(object):
+    """
+    Gives reports a pooled session for their HTTP requests, shared by every
+    report calling the same host with the same profile (reports without a
+    profile get a session of their own, so credentials and cookies are never
+    shared between them). Session options (see
+    http_client.DEFAULT_OPTIONS) are read from the "http" field of the report's
+    profile and connection, and can be overridden by the report's "http" field.
+    """
+    http = {}
+
+    def http_options(self):
+        options = {}
+        if getattr(self, 'profile', None):
+            options.update(self.conf['profiles'][self.profile].get('http', {}))
+        if getattr(self, 'connection', None):
+            options.update(self.conf['connections'][self.connection].get('http', {}))
+        options.update(self.http)
+        return options
+
+    def get_session(self, url, **defaults):
+        """
+        Returns the shared session for url's host. defaults are options used
+        when they are not configured.
+        """
+        defaults.update(self.http_options())
+        host = six.moves.urllib.parse.urlparse(url).netloc
+        return http_client.get_session(host, self.session_scope(), **defaults)
+
+    def session_scope(self):
+        """ Reports with the same scope share sessions, and their cookies. """
+        if getattr(self, 'profile', None):
+            return 'profile', self.profile
+        return 'report', getattr(self, 'name', None)
 
-class RedashReport(BasicReport):
+
+class RedashReport(BasicReport, PollingMixin, HTTPMixin):
     """
     Retrieves data from re:dash API. Makes a GET request to the endpoint.
     Needs redash_url, query_id and api_key in order to work (api_key can be
     for query or for user).
     If refresh set to True, makes a POST request to refresh the query and
     waits for the response before moving forward. The api_key must be of the
-    user type for this to work.
+    user type for this to work. The refresh job is polled starting every
+    sleep_time seconds, with exponential backoff up to poll_max_delay.
     """
     refresh = False
     max_retries = 60
     sleep_time = 1
+    poll_max_delay = 30
     parameters = {}
     result_format = 'json'
 
@@ -330,8 +1104,7 @@ class RedashReport(BasicReport):
     def process(self):
         logging.info('Retrieving query %s from %s', self.query_id,
                      self.redash_url)
-        requests_session = requests.Session()
-        requests_session.headers.update({'Authorization': 'Key {}'.format(self.api_key)})
+        requests_session = self.get_session(self.redash_url)
         result_id = ''
         if self.refresh:
             result_id = self.refresh_query(requests_session)
@@ -339,7 +1112,8 @@ class RedashReport(BasicReport):
         path = '{}/api/queries/{}/results{}.{}'
         path = path.format(self.redash_url, self.query_id, result_id, self.result_format)
 
-        response = requests_session.get(path, params=self.format_parameters())
+        response = requests_session.get(path, params=self.format_parameters(),
+                                        headers=self.headers)
 
         if self.result_format == 'json':
             data = response.json()['query_result']['data']
@@ -352,28 +1126,36 @@ class RedashReport(BasicReport):
     def refresh_query(self, requests_session):
         logging.info('Refreshing query')
         path = '{}/api/queries/{}/refresh'.format(self.redash_url, self.query_id)
-        response = requests_session.post(path, params=self.format_parameters())
+        response = requests_session.post(path, params=self.format_parameters(),
+                                         headers=self.headers)
 
         return self.poll_job(requests_session, response.json()['job'])
 
     def poll_job(self, requests_session, job):
         SUCCESS = 3
         FAILURE = 4
-        retries = 0
-        while job['status'] not in (SUCCESS, FAILURE):
-            response = requests_session.get('{}/api/jobs/{}'.format(self.redash_url, job['id']))
-            job = response.json()['job']
-            time.sleep(self.sleep_time)
-            retries += 1
-            if retries > self.max_retries:
-                raise ReportError('Exceeded max number of retries: %s', self.max_retries)
-
-        logging.info('The query finished refreshing after %s retries', retries)
-        if job['status'] == SUCCESS:
-            return '/' + str(job['query_result_id'])
+        state = {'job': job}
+
+        def check():
+            if state['job']['status'] not in (SUCCESS, FAILURE):
+                response = requests_session.get('{}/api/jobs/{}'.format(self.redash_url, job['id']),
+                                                headers=self.headers)
+                state['job'] = response.json()['job']
+            return state['job']['status'] in (SUCCESS, FAILURE), None
+
+        poller = self.create_poller('Query refresh', initial_delay=self.sleep_time,
+                                    max_polls=self.max_retries + 1)
+        poller.poll(check)
+
+        if state['job']['status'] == SUCCESS:
+            return '/' + str(state['job']['query_result_id'])
 
         raise ReportError('Query failed to refresh')
 
+    @property
+    def headers(self):
+        return {'Authorization': 'Key {}'.format(self.api_key)}
+
     def format_parameters(self):
         return {'p_' + key: self.formatter.format(val)
                 for key, val in six.iteritems(self.parameters)}
@@ -474,7 +1256,8 @@ class AdwordsReport(BasicReport):
 
     A report is downloaded for some customer defined via client_customer_ids
     parameter. If this parameter is a list of customer ids, then results are
-    appendend in one report.
+    appendend in one report. Up to max_workers customers are downloaded
+    concurrently.
 
     Resulting report is always returned as buffer.
     """
@@ -482,6 +1265,7 @@ class AdwordsReport(BasicReport):
     date_range = {'min': '{Y-1d}{m-1d}{d-1d}', 'max': '{Y-1d}{m-1d}{d-1d}'}
 
     adwords_service_version = 'v201809'
+    max_workers = 1
 
     def __init__(self, *args, **kwargs):
         self.report_definition = None
@@ -517,20 +1301,30 @@ class AdwordsReport(BasicReport):
                     return definition.copy()
 
     def process(self):
-        report_downloader = self.ads_client.GetReportDownloader(version=self.adwords_service_version)
-        first_client_id_processed = False
+        # Reports of each customer are downloaded separately, and appended in
+        # the order of client_customer_ids. Only the first one keeps headers.
+        customers = [(customer_id, i > 0) for i, customer_id in enumerate(self.client_customer_ids)]
+        reports = map_concurrently(self.download_customer_report, customers, self.max_workers)
+
         result = six.BytesIO()
-        for customer_id in self.client_customer_ids:
-            report_downloader.DownloadReport(
-                self.report_definition, result,
-                skip_report_header=first_client_id_processed,
-                skip_column_header=first_client_id_processed,
-                skip_report_summary=True, include_zero_impressions=False,
-                client_customer_id=customer_id
-            )
-            first_client_id_processed = True
+        for report in reports:
+            result.write(report)
         return result
 
+    def download_customer_report(self, customer):
+        customer_id, skip_headers = customer
+        logging.info('Downloading report for customer: %s', customer_id)
+        report_downloader = self.ads_client.GetReportDownloader(version=self.adwords_service_version)
+        result = six.BytesIO()
+        report_downloader.DownloadReport(
+            self.report_definition, result,
+            skip_report_header=skip_headers,
+            skip_column_header=skip_headers,
+            skip_report_summary=True, include_zero_impressions=False,
+            client_customer_id=customer_id
+        )
+        return result.getvalue()
+
 
 class GoogleAdsReport(BasicReport):
     """
@@ -541,7 +1335,11 @@ class GoogleAdsReport(BasicReport):
     More about reporting queries in Google Ads API:
     https://developers.google.com/google-ads/api/docs/reporting/overview
 
-    Internally uses google-ads library to make the request.
+    Internally uses google-ads library to make the request. If customer_id is
+    a list, up to max_workers customers are queried concurrently.
+
+    If stream is True, the csv is returned as a StreamingBuffer, which queries
+    the API as the buffer is read, instead of holding all the rows in memory.
     """
 
     query = None
@@ -549,6 +1347,8 @@ class GoogleAdsReport(BasicReport):
     customer_id = None
     header = None
     fieldnames = None
+    max_workers = 1
+    stream = False
 
     def __init__(self, *args, **kwargs):
         super(GoogleAdsReport, self).__init__(*args, **kwargs)
@@ -562,8 +1362,6 @@ class GoogleAdsReport(BasicReport):
             raise ValueError('You have to specify customer_id!')
 
     def process(self):
-        from google.protobuf import json_format
-        from google.api_core import protobuf_helpers
         from google.ads.googleads.client import GoogleAdsClient
 
         if not self.query and self.query_file:
@@ -577,50 +1375,126 @@ class GoogleAdsReport(BasicReport):
         client = GoogleAdsClient.load_from_string(self.creds)
         service = client.get_service('GoogleAdsService')
 
-        results, fieldnames = [], None
-        for customer_id in self.customer_id:
-            logging.info('Querying for customer: %s', customer_id)
-            stream = service.search_stream(query=self.query, customer_id=customer_id)
-
-            for batch in stream:
-                for msg in batch.results:
-                    # MessageToDict is useful because it brings Enum names instead
-                    # of values by default. preserving_proto_field_name flag is
-                    # needed in order for fields to match with paths in field_mask.
-                    row = json_format.MessageToDict(msg, preserving_proto_field_name=True)
-                    fieldnames = batch.field_mask.paths
-
-                    # Here we flatten the message dict and filter out fields that
-                    # aren't explicitly selected in the query (like resource names)
-                    clean_row = []
-                    for path in fieldnames:
-                        # Fieldnames that are reserved python keywords appear in
-                        # python objects with trailing underscore. So far i
-                        # only found "type_". TODO: find a cleaner way of doing this
-                        if path.endswith('.type'):
-                            path += '_'
-
-                        # MessageToDict will not include null metrics sometimes,
-                        # we use a value from the original message in this case
-                        _default = protobuf_helpers.get(msg, path)
-                        value = protobuf_helpers.get(row, path, default=_default)
-                        clean_row.append(value)
-
-                    results.append(clean_row)
+        if self.stream:
+            return StreamingBuffer(self.iter_csv(service))
+        return self.fetch_csv(service)
+
+    def fetch_csv(self, service):
+        """
+        Queries every customer and returns the whole result as csv bytes. If
+        the query returns no rows, only the header and fieldnames are written.
+        """
+        # Customers are queried concurrently, rows are kept in customer order
+        frames = map_concurrently(lambda customer_id: self.fetch_customer(service, customer_id),
+                                  self.customer_id, self.max_workers)
+        frames = [frame for frame in frames if len(frame.columns)]
+        if frames:
+            result = pd.concat(frames, ignore_index=True)
+            if self.fieldnames:
+                result.columns = self.fieldnames
+        else:
+            result = pd.DataFrame(columns=self.fieldnames or [])
 
         # Return result as a csv file
-        data = six.StringIO()
+        data = six.BytesIO()
         if self.header:
-            data.write(self.formatter.format(self.header) + '\n')
-        if self.fieldnames:
-            fieldnames = self.fieldnames
-        csv_writer = csv.writer(data)
-        csv_writer.writerow(fieldnames)
-        csv_writer.writerows(results)
-        return data.getvalue().encode('utf-8')
+            data.write(self.get_header())
+        if len(result.columns):
+            self.write_csv(result, data)
+        return data.getvalue()
+
+    def write_csv(self, frame, buf, header=True):
+        """ Writes rows as csv.writer did, ending lines with \\r\\n. """
+        write_csv(frame, buf, index=False, header=header, **{_line_terminator_arg: '\r\n'})
 
+    def get_header(self):
+        return (self.formatter.format(self.header) + '\n').encode('utf-8')
 
-class FacebookInsightsReport(BasicReport):
+    def iter_csv(self, service):
+        """
+        Yields the result as encoded csv chunks, one for each batch of rows
+        returned by the API. Customers are queried one after the other.
+        """
+        if self.header:
+            yield self.get_header()
+
+        column_header = True
+        for customer_id in self.customer_id:
+            for frame in self.iter_batches(service, customer_id):
+                if self.fieldnames:
+                    frame.columns = self.fieldnames
+                chunk = six.BytesIO()
+                self.write_csv(frame, chunk, header=column_header)
+                column_header = False
+                yield chunk.getvalue()
+
+        if column_header and self.fieldnames:
+            # There were no rows at all
+            chunk = six.BytesIO()
+            self.write_csv(pd.DataFrame(columns=self.fieldnames), chunk)
+            yield chunk.getvalue()
+
+    def fetch_customer(self, service, customer_id):
+        """
+        Runs the query for a customer. Returns the result as a DataFrame with
+        a column for each field path of the query.
+        """
+        frames = list(self.iter_batches(service, customer_id))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def iter_batches(self, service, customer_id):
+        """
+        Runs the query for a customer, yielding a DataFrame for each batch of
+        the results stream, with a column for each field path of the query.
+        """
+        logging.info('Querying for customer: %s', customer_id)
+        stream = service.search_stream(query=self.query, customer_id=customer_id)
+
+        for batch in stream:
+            if not batch.results:
+                continue
+            # Field paths are resolved once per batch, and values are collected
+            # column by column, filtering out fields that aren't explicitly
+            # selected in the query (like resource names)
+            fieldnames = list(batch.field_mask.paths)
+            first = batch.results[0]
+            columns = [list(map(field_accessor(first, path), batch.results)) for path in fieldnames]
+            yield pd.DataFrame(dict(zip(fieldnames, columns)), columns=fieldnames)
+
+
+def field_accessor(message, path):
+    """
+    Returns a function that gets the value of a field path (like
+    "campaign.name") from messages with the same type as the given one. Enum
+    values are returned by name.
+    """
+    import enum
+
+    names = path.split('.')
+    if hasattr(message, '_pb'):
+        # Fieldnames that are reserved python keywords appear in proto-plus
+        # messages with trailing underscore. So far i only found "type_".
+        names = [name + '_' if name == 'type' else name for name in names]
+    getter = operator.attrgetter('.'.join(names))
+
+    if isinstance(getter(message), enum.Enum):
+        # proto-plus messages
+        return lambda msg: getter(msg).name
+
+    # Protobuf messages hold enums as numbers, names come from descriptors
+    descriptor, field = getattr(message, 'DESCRIPTOR', None), None
+    for name in path.split('.'):
+        if descriptor is None or name not in descriptor.fields_by_name:
+            return getter
+        field = descriptor.fields_by_name[name]
+        descriptor = field.message_type
+    if field.enum_type is not None:
+        enum_names = {v.number: v.name for v in field.enum_type.values}
+        return lambda msg: enum_names.get(getter(msg), getter(msg))
+    return getter
+
+
+class FacebookInsightsReport(BasicReport, PollingMixin, HTTPMixin):
     """
     Retrieves the data from the insights endpoint of Facebook's graph API.
     More info on Facebook's insights API: https://developers.facebook.com/docs/marketing-api/insights
@@ -630,7 +1504,14 @@ class FacebookInsightsReport(BasicReport):
     By default, gets the impressions and the reach on the ad level.
 
     The report is generated via Facebook's API async job, the result of which
-    is polled every few seconds, defined via sleep_per_tick parameter.
+    is polled with backoff from poll_initial_delay seconds up to every
+    sleep_per_tick seconds, or sooner if the job is expected to finish before,
+    given its completion percentage. Fails after poll_timeout seconds.
+
+    Big requests can be splitted in several async jobs, that Facebook runs
+    in parallel: object_id may be a list of ids, and time_slices splits the
+    time range in that many jobs. All the jobs are polled together, and their
+    results are merged in a single DataFrame.
     """
 
     defaults = {
@@ -646,8 +1527,12 @@ class FacebookInsightsReport(BasicReport):
     endpoint = '/insights'
     job_results_limit = 500
     sleep_per_tick = 60
+    poll_initial_delay = 5
+    poll_timeout = 6 * 60 * 60
     since = '{Y-1d}-{m-1d}-{d-1d}'
     until = '{Y-1d}-{m-1d}-{d-1d}'
+    time_slices = 1
+    max_workers = 1
 
     def __init__(self, *args, **kwargs):
         self.object_id = None
@@ -670,16 +1555,16 @@ class FacebookInsightsReport(BasicReport):
         self.access_token = get_json_credentials(self)['access_token']
 
         self.params.update({'access_token': self.access_token})
+        self.session = self.get_session(self.base_url, pool_maxsize=max(self.max_workers, 10))
         logging.getLogger("requests").setLevel(logging.WARNING)
 
-    def wait_for_job_completion(self, job_id):
-        tic = 0
+    def graph_request(self, method, url, **kwargs):
+        """
+        Makes a request to the graph API, waiting while the user request limit
+        is reached. Returns the response and its parsed json.
+        """
         while True:
-            # TODO: this loop keeps running forever sometimes. We need to
-            # investigate a bit more about this job status response.
-
-            r = requests.get(self.base_url.format(self.api_version, job_id),
-                             params={'access_token': self.access_token})
+            r = self.session.request(method, url, **kwargs)
             res = r.json()
 
             if 'error' in res and res['error']['code'] == 17:
@@ -687,75 +1572,171 @@ class FacebookInsightsReport(BasicReport):
                 logging.info('Error %s, waiting 61s', res['error']['message'])
                 time.sleep(61)
                 continue
+            return r, res
 
-            status = res['async_status']
+    def job_status(self, job_id):
+        """
+        Returns the status response of an async job, waiting while the user
+        request limit is reached.
+        """
+        _, res = self.graph_request('GET', self.base_url.format(self.api_version, job_id),
+                                    params={'access_token': self.access_token})
+        return res
 
-            if status == 'Job Completed' and res['async_percent_completion'] == 100:
-                break
-            elif status == 'Job Not Started' or res['is_running']:
-                if tic % 3 == 0:
-                    logging.info('Job running, completion percentage: %d', res['async_percent_completion'])
-                time.sleep(self.sleep_per_tick)
-                tic += 1
-                continue
-            raise ReportError('Job failed with status: %s', res['async_status'])
+    def wait_for_job_completion(self, job_id):
+        self.wait_for_jobs([job_id])
+
+    def wait_for_jobs(self, job_ids):
+        """
+        Polls the status of every given async job until all of them are
+        completed. Raises ReportError if any fails or if they don't finish
+        before poll_timeout.
+        """
+        pending = list(job_ids)
+        state = {'tic': 0}
+
+        def check():
+            completion = []
+            for job_id in list(pending):
+                res = self.job_status(job_id)
+                status = res['async_status']
+
+                if status == 'Job Completed' and res['async_percent_completion'] == 100:
+                    pending.remove(job_id)
+                elif status == 'Job Not Started' or res['is_running']:
+                    completion.append(res['async_percent_completion'])
+                else:
+                    raise ReportError('Job {} failed with status: {}'.format(job_id, status))
+
+            if not pending:
+                return True, 100
+            if state['tic'] % 3 == 0:
+                logging.info('%d of %d jobs running, completion percentage: %d', len(pending),
+                             len(job_ids), min(completion))
+            state['tic'] += 1
+            # The slowest job determines when all of them are finished
+            return False, min(completion)
+
+        poller = self.create_poller('Report jobs', max_delay=self.sleep_per_tick)
+        poller.poll(check)
+
+    def split_time_range(self):
+        """
+        Returns the list of time ranges to request, splitting time_range
+        parameter into time_slices contiguous ranges of (roughly) the same
+        number of days. Returns [None] if the time range isn't splitted.
+        """
+        time_range = self.params.get('time_range')
+        if self.time_slices <= 1 or not time_range:
+            return [None]
+        if isinstance(time_range, six.string_types):
+            time_range = json.loads(time_range)
+
+        since = datetime.strptime(time_range['since'], '%Y-%m-%d').date()
+        until = datetime.strptime(time_range['until'], '%Y-%m-%d').date()
+        days = (until - since).days + 1
+        slices = max(min(int(self.time_slices), days), 1)
+
+        ranges, start = [], since
+        for i in range(slices):
+            end = start + dt.timedelta(days=days // slices + (1 if i < days % slices else 0) - 1)
+            ranges.append(json.dumps({'since': start.isoformat(), 'until': end.isoformat()}))
+            start = end + dt.timedelta(days=1)
+        return ranges
+
+    def submit_job(self, job):
+        """ Starts an async job for an (object_id, time_range) pair. """
+        object_id, time_range = job
+        params = self.params.copy()
+        if time_range is not None:
+            params['time_range'] = time_range
+        url = self.url.format(self.api_version, object_id)
+        r, res = self.graph_request('POST', url, params=params)
+
+        if 'report_run_id' not in res:
+            raise ReportError('Could not retrieve the report: {}'.format(r.text))
+        report_run_id = res['report_run_id']
+        logging.info('Got report job id: %s (object %s, time range %s)', report_run_id,
+                     object_id, time_range or params.get('time_range'))
+        return report_run_id
 
     def results_from_response(self, res):
+        """ Returns a DataFrame with the rows in a response of job results. """
+        return self.results_from_page(res.json())
+
+    def results_from_page(self, page):
+        """
+        Returns a DataFrame with the rows of a page of job results. Actions are
+        flattened into action.<action type> columns (with the value of the
+        attribution window), and relevance score into relevance_score.<key>.
+        """
         # TODO: here i'm assuming that the attribution window is not a list
         attr_window = self.params['action_attribution_windows']
 
         action_breakdown = self.params.get('action_breakdowns', None)
 
-        d = res.json()
-        r = []
-        for item in d.copy()['data']:
-            acts = item.pop('actions', [])
-            for act in acts:
-                if attr_window in act:
-                    if action_breakdown and action_breakdown in act:
-                        action_type = act[action_breakdown]
-                    else:
-                        action_type = act['action_type']
-                    item['action.' + action_type] = act[attr_window]
-            rs = item.pop('relevance_score', {})
-            for k, v in rs.items():
-                item['relevance_score.' + k] = v
-            r.append(item)
-        return r
-
-    def process(self):
-        logging.info('Programming report job')
-        url = self.url.format(self.api_version, self.object_id)
-        r = requests.post(url, params=self.params)
-
-        if 'report_run_id' not in r.json():
-            raise ReportError('Could not retrieve the report: %s', r.text)
-        report_run_id = r.json()['report_run_id']
-        logging.info('Got report job id: %s', report_run_id)
-
-        self.wait_for_job_completion(report_run_id)
-        logging.info('Job finished! asking for results')
+        result = pd.DataFrame(page['data'])
+        if 'actions' in result:
+            actions = [
+                (row, act[action_breakdown] if action_breakdown and action_breakdown in act
+                 else act['action_type'], act[attr_window])
+                for row, acts in result.pop('actions').items() if isinstance(acts, list)
+                for act in acts if attr_window in act
+            ]
+            if actions:
+                actions = pd.DataFrame(actions, columns=['row', 'action_type', 'value'])
+                actions = actions.drop_duplicates(['row', 'action_type'], keep='last')
+                actions = actions.set_index(['row', 'action_type'])['value'].unstack()
+                result = result.join(actions.add_prefix('action.'))
+
+        if 'relevance_score' in result:
+            scores = [rs if isinstance(rs, dict) else {} for rs in result.pop('relevance_score')]
+            scores = pd.DataFrame(scores, index=result.index)
+            result = result.join(scores.add_prefix('relevance_score.'))
+        return result
 
+    def iter_results(self, report_run_id):
+        """ Yields a DataFrame for each page of results of a finished job. """
         params = {'access_token': self.access_token, 'limit': self.job_results_limit,
                   'fields': self.params['fields']}
         url = self.url.format(self.api_version, report_run_id)
-        resp = requests.get(url, params=params)
-        result = pd.DataFrame(self.results_from_response(resp))
+        page = self.session.get(url, params=params).json()
+        yield self.results_from_page(page)
+
+        while 'next' in page['paging']:
+            page = self.session.get(page['paging']['next']).json()
+            yield self.results_from_page(page)
 
-        d = resp.json()
-        while 'next' in d['paging']:
-            resp = requests.get(d['paging']['next'])
-            d = resp.json()
-            result = result.append(self.results_from_response(resp), ignore_index=True)
+    def process(self):
+        object_ids = self.object_id if isinstance(self.object_id, list) else [self.object_id]
+        jobs = [(object_id, time_range) for object_id in object_ids
+                for time_range in self.split_time_range()]
+        logging.info('Programming %d report jobs', len(jobs))
+        job_ids = map_concurrently(self.submit_job, jobs, self.max_workers)
+
+        self.wait_for_jobs(job_ids)
+        logging.info('Jobs finished! asking for results')
+
+        # Pages are concatenated once, instead of growing the result on each
+        # page. Jobs results are kept in the order jobs were defined.
+        pages = map_concurrently(lambda job_id: list(self.iter_results(job_id)), job_ids,
+                                 self.max_workers)
+        result = pd.concat([page for job_pages in pages for page in job_pages],
+                           ignore_index=True, sort=False)
 
         logging.info('Finished retreiving results')
         return result
 
 
-class RTBHouseReport(FormattedReport):
+class RTBHouseReport(FormattedReport, HTTPMixin):
     """
     Retrieves marketing campaigns' costs for all the campaigns (advertisers)
     for your account.
+
+    Stats of up to max_workers advertisers are requested concurrently, over a
+    pool of keep-alive connections. Requests answered with 429 or 5xx
+    statuses are retried up to max_retries times, with exponential backoff
+    (unless configured otherwise in http options).
     """
     api_url = 'https://api.panel.rtbhouse.com/v5'
     group_by = 'day'
@@ -764,6 +1745,9 @@ class RTBHouseReport(FormattedReport):
     metrics = ('campaignCost-clicksCount-conversionsCount-conversionsValue-cr-'
                'ecpa-impsCount')
 
+    max_workers = 1
+    max_retries = 3
+    retry_backoff = 0.5
     _timeout = 60
 
     campaign_names = {}
@@ -776,11 +1760,18 @@ class RTBHouseReport(FormattedReport):
         self.formatter = FilenameFormatter(conf)
 
         self.creds = get_json_credentials(self)
+        self.session = self.get_session(self.api_url, pool_maxsize=max(self.max_workers, 10),
+                                        max_retries=self.max_retries,
+                                        backoff_factor=self.retry_backoff)
 
     def process(self):
+        advertisers = self.get_campaigns_info()
+        advertisers_stats = map_concurrently(
+            lambda advertiser: self.get_campaigns_stats(advertiser['hash']),
+            advertisers, self.max_workers)
+
         stats = []
-        for advertiser in self.get_campaigns_info():
-            advertiser_stats = self.get_campaigns_stats(advertiser['hash'])
+        for advertiser, advertiser_stats in zip(advertisers, advertisers_stats):
             for advertiser_stat in advertiser_stats:
                 advertiser_stat.update(advertiser)
             stats += advertiser_stats
@@ -788,8 +1779,11 @@ class RTBHouseReport(FormattedReport):
         logging.info('{} campaigns costs fetched.'.format(len(stats)))
 
         costs_df = pd.DataFrame(stats)
-        for campaign_id, campaign_name in self.campaign_names.items():
-            costs_df.loc[costs_df['hash']==campaign_id, 'name'] = campaign_name
+        if self.campaign_names and 'hash' in costs_df:
+            names = costs_df['hash'].map(self.campaign_names)
+            if 'name' in costs_df:
+                names = names.fillna(costs_df['name'])
+            costs_df['name'] = names
 
         costs_df.rename(columns=self.column_names, inplace=True)
         return costs_df
@@ -797,7 +1791,7 @@ class RTBHouseReport(FormattedReport):
     def _get(self, path, **kwargs):
         kwargs['timeout'] = self._timeout
         kwargs['auth'] = (self.creds['username'], self.creds['password'])
-        res = requests.get(self.api_url + path, **kwargs)
+        res = self.session.get(self.api_url + path, **kwargs)
         if not res.ok:
             raise ReportError(str(res) + '\n' + str(res.content))
 
@@ -826,14 +1820,19 @@ class RTBHouseReport(FormattedReport):
         ))
 
 
-class RakutenReport(FormattedReport):
+class RakutenReport(FormattedReport, HTTPMixin):
     """
     Rakuten marketing reports acquisition.
     The reported specified by name is requested to Rakuten API with the
     corresponding filters defined by the user.
     https://advhelp.rakutenmarketing.com/hc/en-us/articles/206630745
+
+    The report is parsed while it's downloaded, without holding the whole
+    response in memory. If chunksize is set, the report is returned in chunks
+    of that many rows, which results process as they arrive.
     """
     filters = {}
+    chunksize = None
     url_template = 'https://ran-reporting.rakutenmarketing.com/en/reports/{report_name}/filters'
 
     def __init__(self, conf, *args, **kwargs):
@@ -845,6 +1844,20 @@ class RakutenReport(FormattedReport):
         self.token = get_json_credentials(self)['token']
 
     def process(self):
+        response = self.request_report()
+        if self.chunksize:
+            return ChunkedData(self.read_chunks(response))
+
+        with closing(response):
+            report_df = pd.read_csv(response.raw)
+
+        msg = 'Report {report_name} downloaded. {lines} lines fetched.'
+        logging.info(msg.format(report_name=self.report_name, lines=len(report_df)))
+
+        return report_df
+
+    def request_report(self):
+        """ Returns the streamed response with the report's csv. """
         params = {k: self.formatter.format(v) for k, v in self.filters.items()}
 
         msg = 'Requesting {report_name} report with {filters} filters.'
@@ -852,21 +1865,34 @@ class RakutenReport(FormattedReport):
 
         params['token'] = self.token
         url = self.url_template.format(report_name=self.report_name)
-        response = requests.get(url, params=params)
-
-        result = six.BytesIO(response.content)
-        result.seek(0)
-        report_df = pd.read_csv(result)
+        response = self.get_session(url).get(url, params=params, stream=True)
+        if not response.ok:
+            response.close()
+            raise ReportError('Could not download report {}: {}'.format(
+                self.report_name, response.status_code))
+
+        # Makes the raw stream decode gzip (or deflate) content encoding
+        response.raw.decode_content = True
+        return response
+
+    def read_chunks(self, response):
+        """ Yields the report in DataFrames of chunksize rows. """
+        lines = 0
+        with closing(response):
+            for chunk in pd.read_csv(response.raw, chunksize=int(self.chunksize)):
+                lines += len(chunk)
+                yield chunk
 
         msg = 'Report {report_name} downloaded. {lines} lines fetched.'
-        logging.info(msg.format(report_name=self.report_name, lines=len(report_df)))
-
-        return report_df
+        logging.info(msg.format(report_name=self.report_name, lines=lines))
 
 
-class BingAdsReport(FileReport):
+class BingAdsReport(FileReport, PollingMixin):
     """
-    Downloads report from Microsoft Ads platform
+    Downloads report from Microsoft Ads platform. The report is requested as
+    an asynchronous download, polled with exponential backoff. Fails after
+    report_request_timeout milliseconds, or poll_timeout seconds if it's not
+    set.
     """
     customer_id = None
     account_id = None
@@ -903,6 +1929,9 @@ class BingAdsReport(FileReport):
     report_time_zone = None
     return_only_complete_data = False
 
+    poll_initial_delay = 5
+    poll_timeout = 6 * 60 * 60
+
     def __init__(self, *args, **kwargs):
         super(BingAdsReport, self).__init__(*args, **kwargs)
         self.credentials = get_json_credentials(self)
@@ -910,7 +1939,7 @@ class BingAdsReport(FileReport):
     def process(self):
         from bingads import AuthorizationData, ServiceClient
         from bingads.authorization import OAuthDesktopMobileAuthCodeGrant
-        from bingads.v13.reporting import ReportingServiceManager, ReportingDownloadParameters
+        from bingads.v13.reporting import ReportingServiceManager
 
         if self.verbose:
             logging.getLogger('suds.client').setLevel(logging.DEBUG)
@@ -942,7 +1971,6 @@ class BingAdsReport(FileReport):
 
         reporting_service_manager = ReportingServiceManager(
             authorization_data=authorization_data,
-            poll_interval_in_milliseconds=5000,
             environment=self.environment
         )
 
@@ -975,17 +2003,28 @@ class BingAdsReport(FileReport):
         report_columns.KeywordPerformanceReportColumn.append(self.report_columns)
         report_request.Columns = report_columns
 
+        operation = reporting_service_manager.submit_download(report_request)
+        state = {}
+
+        def check():
+            state['status'] = operation.get_status()
+            if state['status'].status == 'Error':
+                raise ReportError('Report request failed: {}'.format(state['status']))
+            return state['status'].status == 'Success', None
+
+        timeout = self.report_request_timeout
+        poller = self.create_poller('Report request',
+                                    timeout=timeout / 1000. if timeout else self.poll_timeout)
+        poller.poll(check)
+
         with tempfile.TemporaryDirectory() as temp_dir:
-            reporting_download_parameters = ReportingDownloadParameters(
-                report_request=report_request,
+            file_path = operation.download_result_file(
                 result_file_directory=temp_dir,
                 result_file_name=self.filename,
-                overwrite_result_file=True,
-                timeout_in_milliseconds=self.report_request_timeout
+                decompress=True,
+                overwrite=True
             )
 
-            file_path = reporting_service_manager.download_file(reporting_download_parameters)
-
             if file_path:
                 with open(file_path, 'rb') as f:
                     return self.process_path_or_buff(f)
@@ -1004,9 +2043,18 @@ class DownloadFromS3(FileReport):
     Downloads an object from Amazon S3. Object's location is defined by bucket
     and filename parameters (filename is the key of the object in S3).
 
-    The resulting object is processed as with FileReport's logic (i.e. parsed
-    as pandas.DataFrame if filename's extension is csv-like).
+    The object is downloaded to a temporary file, in parts of
+    multipart_chunksize bytes fetched by up to max_concurrency concurrent
+    ranged requests. Then it's processed as with FileReport's logic (i.e.
+    parsed as pandas.DataFrame if filename's extension is csv-like). Raw
+    objects are returned as the temporary file, without copying them to memory
+    (concurrent results share it memory mapped).
+
+    Like in FileReport, filename can be a glob pattern: keys under the
+    pattern's prefix are listed, and the matching ones are downloaded.
     """
+    multipart_chunksize = 8 * 1024 * 1024
+    max_concurrency = 10
 
     def __init__(self, *args, **kwargs):
         super(DownloadFromS3, self).__init__(*args, **kwargs)
@@ -1018,11 +2066,66 @@ class DownloadFromS3(FileReport):
         logging.info('Connecting to s3 using key %s', key_id)
         self.s3 = boto3.client('s3', **self.credentials)
 
+    def transfer_config(self):
+        from boto3.s3.transfer import TransferConfig
+        chunksize = int(self.multipart_chunksize)
+        return TransferConfig(multipart_threshold=chunksize, multipart_chunksize=chunksize,
+                              max_concurrency=int(self.max_concurrency))
+
+    def download(self, key):
+        """ Returns a temporary file with the object's content. """
+        logging.info('Downloading file %s from bucket %s', key, self.bucket)
+        f = tempfile.TemporaryFile()
+        try:
+            self.s3.download_fileobj(self.bucket, key, f, Config=self.transfer_config())
+        except Exception:
+            f.close()
+            raise
+        # Parts are written concurrently, so the position isn't the size
+        f.seek(0, os.SEEK_END)
+        logging.info('Downloaded %d bytes', f.tell())
+        f.seek(0)
+        return f
+
+    def exists(self, filename):
+        response = self.s3.list_objects_v2(Bucket=self.bucket, Prefix=filename, MaxKeys=1)
+        return any(obj['Key'] == filename for obj in response.get('Contents', []))
+
+    def list_parts(self):
+        """ Returns the sorted keys matching filename pattern. """
+        since = self.get_modified_since()
+        prefix = re.split(r'[*?[]', self.filename, 1)[0]
+        keys = []
+        # Wildcards don't match / in keys, as they don't in local paths
+        regex = glob_to_regex(self.filename)
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                if not regex.match(obj['Key']):
+                    continue
+                if since is not None and pd.Timestamp(obj['LastModified']) < since:
+                    continue
+                keys.append(obj['Key'])
+        return sorted(keys)
+
+    def read_part(self, key):
+        with self.download(key) as f:
+            return self.process_path_or_buff(f)
+
     def process(self):
-        logging.info('Downloading file %s from bucket %s', self.filename, self.bucket)
-        obj = self.s3.get_object(Bucket=self.bucket, Key=self.filename)
+        if self.is_pattern():
+            return self.process_parts()
+
+        f = self.download(self.filename)
+        if self.raw:
+            return f
+
+        with f:
+            return self.process_path_or_buff(f)
+
 
-        return self.process_path_or_buff(obj['Body'])
+# pandas.Panel was removed in pandas 1.0
+_frame_types = tuple(getattr(pd, name) for name in ('DataFrame', 'Panel') if hasattr(pd, name))
 
 
 class Result(object):
@@ -1042,6 +2145,28 @@ class Result(object):
         """ Saves the data. Must be implemented in subclasses. """
         pass
 
+    @classmethod
+    def save_all(cls, results, max_workers=1):
+        """
+        Saves several results of this class, like the partitions of a
+        PartitionedResult, up to max_workers at the same time. results can be
+        a lazy iterable, consumed as results are saved. A failing result
+        doesn't stop the rest, errors are raised together at the end.
+        Subclasses can override it to save them together more efficiently.
+        """
+        def save(result):
+            try:
+                result.save()
+            except Exception:
+                logging.exception('Result %s failed', type(result).__name__)
+                raise
+
+        outcomes = run_concurrently(save, results, max_workers)
+        errors = [e for _, e in outcomes if e is not None]
+        if errors:
+            raise ReportError('{} of {} results failed: {}'.format(
+                len(errors), len(outcomes), '; '.join(str(e) for e in errors)))
+
 
 class ModuleResult(Result):
     """
@@ -1060,7 +2185,9 @@ class ModuleResult(Result):
         module_name = os.path.basename(self.result_file).split('.')[0]
         module = imp.load_source(module_name, self.result_file)
         klass = module.__dict__[self.result_class]
-        result = klass(self.conf, self.data, **self.kwargs)
+        # Custom results expect a DataFrame, chunks are concatenated for them
+        data = as_dataframe(self.data) if isinstance(self.data, ChunkedData) else self.data
+        result = klass(self.conf, data, **self.kwargs)
         result.save()
 
 
@@ -1068,6 +2195,10 @@ class FileResult(Result):
     """
     Abstract result class for working with files or buffers. Decides how to write
     the file based on it's extension and formats the output filename.
+
+    csv, tsv and json files are compressed if the filename ends with .gz or
+    .zst, and parquet and feather files with the codec set in compression.
+    compression_level applies to both.
     """
 
     encoding = 'utf-8'
@@ -1077,12 +2208,22 @@ class FileResult(Result):
     header = True
     result_variables = {}
     extra_args = {}
+    serialization_cache = None
+    compression = None
+    compression_level = None
+
+    # Formats that are compressed by themselves, written to seekable files
+    binary_formats = {'xls', 'xlsx', 'xlsm', 'parquet', 'feather', 'arrow'}
 
     def __init__(self, *args, **kwargs):
         super(FileResult, self).__init__(*args, **kwargs)
-        self.extension = self.filename.split('.')[-1]
+        self.extension, self.file_compression = split_extension(self.filename)
+        if self.file_compression is not None and self.extension in self.binary_formats:
+            raise ReportError('{} files can\'t be compressed as {}, use compression '
+                              'option for parquet and feather'.format(self.extension,
+                                                                      self.file_compression))
         self.file_formatter = FilenameFormatter(self.conf, self.result_variables)
-        self.raw = not isinstance(self.data, (pd.DataFrame, pd.Panel))
+        self.raw = not isinstance(self.data, _frame_types + (ChunkedData,))
 
     def get_filename(self):
         """
@@ -1094,13 +2235,27 @@ class FileResult(Result):
     def write_data(self, path_or_buf):
         """
         Writes data to a file on given path or to passed buffer. Excel
-        formats are written as excel files, tsv as tab separated values and the
-        rest as csv.
+        formats are written as excel files, tsv as tab separated values, parquet
+        and feather in those formats and the rest as csv.
         """
+        if self.file_compression is not None:
+            with compressed_file(path_or_buf, self.file_compression, 'wb',
+                                 self.compression_level) as f:
+                self.write_uncompressed(f)
+        else:
+            self.write_uncompressed(path_or_buf)
+
+    def write_uncompressed(self, path_or_buf):
+        """ Writes data in the format of the extension, without compressing it. """
+        if self.extension in {'parquet', 'feather', 'arrow'}:
+            return self.write_arrow(path_or_buf)
+
         args = dict(encoding=self.encoding, index=self.index,
                     float_format=self.float_format, header=self.header)
         args.update(self.extra_args)
-        if self.extension in {'xls', 'xlsx', 'xlsm'}:
+        if isinstance(self.data, ChunkedData):
+            self.write_chunks(path_or_buf, args)
+        elif self.extension in {'xls', 'xlsx', 'xlsm'}:
             self.data.to_excel(path_or_buf, engine='xlsxwriter', **args)
         else:
             if self.extension in {'tsv'}:
@@ -1108,31 +2263,148 @@ class FileResult(Result):
             if six.PY2 or isinstance(path_or_buf, six.string_types):
                 self.data.to_csv(path_or_buf, **args)
             else:
-                # Workaround to pandas not being able to write to BytesIO in Python 3
-                s = self.data.to_csv(**args)
-                path_or_buf.write(s.encode(self.encoding))
+                # pandas can't write to BytesIO in Python 3
+                write_csv(self.data, path_or_buf, **args)
+
+    def write_arrow(self, path_or_buf):
+        """
+        Writes data as parquet or feather. ChunkedData is written to parquet
+        one chunk at a time, as row groups.
+        """
+        args = {}
+        if self.compression is not None:
+            args['compression'] = self.compression
+        if self.compression_level is not None:
+            args['compression_level'] = int(self.compression_level)
+        args.update(self.extra_args)
+        if self.extension == 'parquet' and isinstance(self.data, ChunkedData):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            writer = None
+            for chunk in self.data:
+                if writer is None:
+                    table = pa.Table.from_pandas(chunk, preserve_index=self.index)
+                    writer = pq.ParquetWriter(path_or_buf, table.schema, **args)
+                else:
+                    # Types inferred for each chunk may differ (e.g. an int
+                    # column with nulls is float), so they're cast to the
+                    # schema of the first one.
+                    table = pa.Table.from_pandas(chunk, schema=writer.schema,
+                                                 preserve_index=self.index)
+                writer.write_table(table)
+            if writer is None:
+                pd.DataFrame().to_parquet(path_or_buf, **args)
+            else:
+                writer.close()
+            return
+
+        data = as_dataframe(self.data)
+        if self.extension == 'parquet':
+            data.to_parquet(path_or_buf, index=self.index, **args)
+        else:
+            # pandas only passes compression options to pyarrow since 1.1.
+            # feather only stores the default index.
+            from pyarrow import feather
+            feather.write_feather(data.reset_index(drop=not self.index), path_or_buf, **args)
+
+    def write_chunks(self, path_or_buf, args):
+        """
+        Writes ChunkedData one chunk at a time: header is only written for the
+        first chunk, and the rest are appended after it.
+        """
+        header = args.pop('header')
+        if self.extension in {'xls', 'xlsx', 'xlsm'}:
+            writer = path_or_buf
+            if isinstance(path_or_buf, six.string_types):
+                writer = pd.ExcelWriter(path_or_buf, engine='xlsxwriter')
+            startrow = args.pop('startrow', 0)
+            for i, chunk in enumerate(self.data):
+                chunk_header = header if i == 0 else False
+                chunk.to_excel(writer, engine='xlsxwriter', startrow=startrow,
+                               header=chunk_header, **args)
+                startrow += len(chunk) + (1 if chunk_header else 0)
+            if writer is not path_or_buf:
+                writer.save()
+            return
+
+        if self.extension in {'tsv'}:
+            args['sep'] = '\t'
+        for i, chunk in enumerate(self.data):
+            chunk_header = header if i == 0 else False
+            if isinstance(path_or_buf, six.string_types):
+                chunk.to_csv(path_or_buf, mode='w' if i == 0 else 'a',
+                             header=chunk_header, **args)
+            elif six.PY2:
+                chunk.to_csv(path_or_buf, header=chunk_header, **args)
+            else:
+                write_csv(chunk, path_or_buf, header=chunk_header, **args)
+
+    def serialize_to(self, buf):
+        """ Writes the data to a binary buffer, based on the file extension. """
+        if self.extension in {'xls', 'xlsx', 'xlsm'}:
+            writer = pd.ExcelWriter(buf, engine='xlsxwriter')
+            self.write_data(writer)
+            writer.save()
+        else:
+            self.write_data(buf)
+
+    def serialize(self):
+        """ Returns the data rendered as bytes, based on the file extension. """
+        buf = six.BytesIO()
+        self.serialize_to(buf)
+        return buf.getvalue()
+
+    def serialization_key(self):
+        """
+        Returns the settings that determine how the data is serialized. Results
+        with the same data and key share serialized contents.
+        """
+        extra_args = sorted((k, repr(v)) for k, v in self.extra_args.items())
+        return (self.extension, self.file_compression, self.compression,
+                self.compression_level, self.encoding, self.index, self.header,
+                self.float_format, tuple(extra_args))
+
+    def can_share_serialization(self):
+        """ Returns True if the data is rendered whole, so it can be cached. """
+        return (not self.raw and not is_buffer(self.data) and
+                not isinstance(self.data, ChunkedData))
+
+    def shares_serialization(self):
+        """
+        Returns True if the serialized data is shared with other results
+        through serialization_cache, so get_buffer returns the cached bytes.
+        """
+        return self.serialization_cache is not None and self.can_share_serialization()
 
     def get_buffer(self):
         """
         Returns a buffer with file data. Useful for attaching buffer to
         requests, emails, etc. instead of writing to disk.
+
+        If a serialization_cache is set, the rendered data is shared with
+        the results that serialize the same data with the same settings.
         """
 
         if is_buffer(self.data):
             self.data.seek(0)
             return self.data
 
-        io = six.BytesIO()
         if self.raw:
-            io.write(self.data)
-        elif self.extension in {'xls', 'xlsx', 'xlsm'}:
-            writer = pd.ExcelWriter(io, engine='xlsxwriter')
-            self.write_data(writer)
-            writer.save()
-        else:
-            self.write_data(io)
-        io.seek(0)
-        return io
+            return MemoryReader(self.data)
+
+        if isinstance(self.data, ChunkedData):
+            # Chunks are written to a temporary file to keep memory bounded
+            buf = tempfile.TemporaryFile()
+            self.serialize_to(buf)
+            buf.seek(0)
+            return buf
+
+        if self.serialization_cache is None:
+            return six.BytesIO(self.serialize())
+        contents = self.serialization_cache.get(self.data, self.serialization_key(),
+                                                self.serialize)
+        # The buffer shares the cached bytes until it's written to
+        return six.BytesIO(contents)
 
 
 class WriteToFile(FileResult):
@@ -1146,7 +2418,8 @@ class WriteToFile(FileResult):
         logging.info('Writing result to %s', filename)
 
         if self.raw:
-            mode = 'w+' + ('b' if isinstance(self.data, (bytes, six.BytesIO)) else '')
+            binary_types = (bytes, memoryview, six.BytesIO, io.RawIOBase, io.BufferedIOBase)
+            mode = 'w+' + ('b' if isinstance(self.data, binary_types) else '')
             with open(filename, mode) as f:
                 if is_buffer(self.data):
                     self.data.seek(0)
@@ -1323,12 +2596,8 @@ class UploadToSftp(FileResult):
             sftp.close()
 
 
-def create_drive(profile, grant):
-    """ auth google drive, used in both classes """
-    from httplib2 import Http
-    from apiclient import discovery
-    from pydrive2.auth import GoogleAuth
-    from pydrive2.drive import GoogleDrive
+def create_drive_credentials(profile, grant):
+    """ Returns service account credentials of a profile, delegated to grant. """
     from oauth2client.service_account import ServiceAccountCredentials
     # Authorization method taken from here:
     # http://stackoverflow.com/questions/22555433/pydrive-and-google-drive-automate-verification-process
@@ -1336,8 +2605,17 @@ def create_drive(profile, grant):
     creds = json.loads(profile['credentials'])
     credentials = ServiceAccountCredentials.from_json_keyfile_dict(
         creds, 'https://www.googleapis.com/auth/drive')
-    credentials.authorize(Http())
-    credentials = credentials.create_delegated(grant)
+    return credentials.create_delegated(grant)
+
+
+def create_drive(profile, grant, credentials=None):
+    """ auth google drive, used in both classes """
+    from httplib2 import Http
+    from apiclient import discovery
+    from pydrive2.auth import GoogleAuth
+    from pydrive2.drive import GoogleDrive
+    if credentials is None:
+        credentials = create_drive_credentials(profile, grant)
 
     class CustomGoogleAuth(GoogleAuth):
 
@@ -1362,27 +2640,236 @@ def create_drive(profile, grant):
     return GoogleDrive(gauth)
 
 
+_drive_credentials = {}
+_drive_clients = {}
+_drive_lock = threading.Lock()
+
+
+@contextmanager
+def checkout_drive(profile, grant):
+    """
+    Yields a GoogleDrive client for a profile and grant, that no other thread
+    uses until the block ends, as their http transports aren't thread safe.
+    Clients are then returned to a pool and reused by any thread, so only as
+    many clients (with their discovery service) are built as blocks run at the
+    same time. Credentials are created once and shared by all the clients, so
+    their access token is only refreshed when it expires.
+    """
+    key = (profile['name'], grant)
+    with _drive_lock:
+        idle = _drive_clients.get(key)
+        client = idle.pop() if idle else None
+        if client is None and key not in _drive_credentials:
+            _drive_credentials[key] = create_drive_credentials(profile, grant)
+        credentials = _drive_credentials.get(key)
+    if client is None:
+        client = create_drive(profile, grant, credentials)
+    try:
+        yield client
+    finally:
+        with _drive_lock:
+            _drive_clients.setdefault(key, []).append(client)
+
+
+def dispose_drive_clients():
+    """ Forgets every Drive client and credentials. """
+    with _drive_lock:
+        _drive_clients.clear()
+        _drive_credentials.clear()
+
+
+_drive_folder_mime_type = 'application/vnd.google-apps.folder'
+
+
+def _drive_quote(value):
+    """ Returns value as a quoted string for Drive search queries. """
+    return "'{}'".format(value.replace('\\', '\\\\').replace("'", "\\'"))
+
+
+def _drive_error_status(error):
+    """ Returns the http status of a pydrive or googleapiclient error. """
+    from pydrive2.files import ApiRequestError
+    # ApiRequestError is an IOError for some reason, that wraps an
+    # apiclient.errors.HttpError
+    if isinstance(error, ApiRequestError):
+        error = error.args[0]
+    return error.resp.status
+
+
+class DriveLookupCache(object):
+    """
+    Cache of the metadata (id, title and mimeType) of Drive files found by
+    title, keyed by (drive id, parent folder id, title). It's shared by Drive
+    reports and results, so they don't have to search the same folders and
+    files again. Entries expire after the ttl passed to get.
+
+    If path is given, entries are loaded from that json file and saved to it,
+    at most every flush_interval seconds and when flush is called, so they're
+    kept between runs. The file is replaced atomically, and an unreadable
+    file is treated as an empty cache. Files loaded from it may have been
+    deleted since, so they're checked once (see needs_check).
+    """
+
+    flush_interval = 30
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._flushed = time.time()
+        self._checked = set()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        self._entries = {}
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                for key, entry in json.load(f).items():
+                    self._entries[tuple(json.loads(key))] = entry
+        except (IOError, OSError, ValueError, TypeError) as e:
+            logging.warning('Ignoring unreadable Drive lookup cache %s: %s', self.path, e)
+            self._entries = {}
+
+    def _dump(self):
+        entries = {json.dumps(list(key)): entry for key, entry in self._entries.items()}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+            # os.rename doesn't replace existing files on Windows
+            getattr(os, 'replace', os.rename)(temp_path, self.path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        self._dirty = False
+        self._flushed = time.time()
+
+    def _changed(self):
+        self._dirty = True
+        if self.path and time.time() - self._flushed >= self.flush_interval:
+            self._dump()
+
+    def get(self, key, ttl):
+        """ Returns the metadata cached for key if it's not older than ttl seconds. """
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            entry = self._entries.get(key)
+        if entry is None or time.time() - entry['time'] > ttl:
+            return None
+        return entry['metadata']
+
+    def set(self, key, metadata):
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            self._entries[key] = {'metadata': metadata, 'time': time.time()}
+            self._checked.add(metadata['id'])
+            self._changed()
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            if self._entries.pop(key, None) is not None:
+                self._changed()
+
+    def needs_check(self, file_id):
+        """
+        Returns True if file_id wasn't found or checked by this process yet,
+        so it may have been deleted since it was cached.
+        """
+        with self._lock:
+            return file_id not in self._checked
+
+    def mark_checked(self, file_id):
+        with self._lock:
+            self._checked.add(file_id)
+
+    def flush(self):
+        """ Saves pending changes to the cache file, if any. """
+        with self._lock:
+            if self.path and self._dirty:
+                self._dump()
+
+
+_drive_caches = {}
+_drive_caches_lock = threading.Lock()
+
+
+def get_drive_cache(path=None):
+    """ Returns the lookup cache shared by every Drive object using path. """
+    with _drive_caches_lock:
+        if path not in _drive_caches:
+            _drive_caches[path] = DriveLookupCache(path)
+        return _drive_caches[path]
+
+
+def flush_drive_caches():
+    """ Saves pending changes of every Drive lookup cache to its file. """
+    with _drive_caches_lock:
+        caches = list(_drive_caches.values())
+    for cache in caches:
+        try:
+            cache.flush()
+        except (IOError, OSError) as e:
+            logging.warning('Could not save Drive lookup cache %s: %s', cache.path, e)
+
+
 class DriveMixin(object):
     start_timeout = 2
     max_timeout = 300
     retry_status_codes = (429,)  # 429 = Too many requests
     drive_id = None
+    drive_profile = None
+    lookup_cache_ttl = 600
+    lookup_cache_file = None
+    rate_limiter = None
+
+    _drive = None
+
+    @property
+    def drive(self):
+        """ Drive client checked out with drive_client. """
+        if self._drive is None:
+            raise ReportError('Drive client used outside of drive_client block')
+        return self._drive
+
+    @contextmanager
+    def drive_client(self):
+        """
+        Checks out a Drive client (see checkout_drive) to be used as self.drive
+        inside the block. Nested blocks use the same client.
+        """
+        if self._drive is not None:
+            yield self._drive
+            return
+        with checkout_drive(self.drive_profile, self.grant) as client:
+            self._drive = client
+            try:
+                yield client
+            finally:
+                self._drive = None
 
     def _drive_call(self, method, *args, **kwargs):
         from pydrive2.files import ApiRequestError
         from googleapiclient.errors import HttpError
         timeout, limit = self.start_timeout, self.max_timeout
         while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
             try:
                 result = method(*args, **kwargs)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.reward()
                 return result
             except (ApiRequestError, HttpError) as e:
-                # ApiRequestError is an IOError for some reason, that wraps
-                # an apiclient.errors.HttpError
-                if isinstance(e, ApiRequestError):
-                    status = e.args[0].resp.status
-                else:
-                    status = e.resp.status
+                status = _drive_error_status(e)
+                if status == 429 and self.rate_limiter is not None:
+                    self.rate_limiter.penalize()
                 if timeout < limit and (status >= 500 or status in self.retry_status_codes):
                     log = 'An error occured executing %s: %s. Waiting %d seconds.'
                     logging.info(log, method, e, timeout)
@@ -1407,6 +2894,116 @@ class DriveMixin(object):
             return args
         return base_arguments
 
+    def find_file(self, title, parent_id=None):
+        """
+        Returns the first file with given title (inside parent_id folder, if
+        given), or None if there's none. Files found are kept in the lookup
+        cache: if the file is cached, only a dict with its id, title and
+        mimeType is returned, instead of a GoogleDriveFile. Cached files are
+        checked by id only once per process: if they're deleted later,
+        retry_stale searches them again.
+        """
+        cache = get_drive_cache(self.lookup_cache_file)
+        key = (self.drive_id, parent_id, title)
+        metadata = cache.get(key, self.lookup_cache_ttl)
+        if metadata is not None and cache.needs_check(metadata['id']):
+            if self.is_live(metadata['id']):
+                cache.mark_checked(metadata['id'])
+            else:
+                cache.invalidate(key)
+                metadata = None
+        if metadata is not None:
+            lookups = getattr(self, '_cached_lookups', None)
+            if lookups is not None:
+                lookups.append(key)
+            return metadata
+
+        query = "trashed=false and title={}".format(_drive_quote(title))
+        if parent_id:
+            query += " and '{}' in parents".format(parent_id)
+        request_arguments = self._request_arguments({'q': query, 'maxResults': 1})
+        with self.drive_client() as drive:
+            file_list = self._drive_call(drive.ListFile(request_arguments).GetList)
+        if not file_list:
+            return None
+
+        cache.set(key, {k: file_list[0].get(k) for k in ('id', 'title', 'mimeType')})
+        return file_list[0]
+
+    def is_live(self, file_id):
+        """
+        Returns False if a file was trashed or deleted, so its cached id
+        isn't used. Getting a file by id is much cheaper than searching it.
+        """
+        from pydrive2.files import ApiRequestError
+        from googleapiclient.errors import HttpError
+        try:
+            with self.drive_client() as drive:
+                request = drive.auth.service.files().get(fileId=file_id, fields='labels',
+                                                         supportsAllDrives=True)
+                metadata = self._drive_call(request.execute)
+        except (ApiRequestError, HttpError) as e:
+            if _drive_error_status(e) == 404:
+                return False
+            raise
+        return not metadata.get('labels', {}).get('trashed', False)
+
+    def find_files(self, titles, parent_id=None, batch_size=50):
+        """
+        Returns a dict with the files found for each of titles (inside
+        parent_id folder, if given), querying batch_size titles at a time
+        instead of one by one. Found files are kept in the lookup cache.
+        """
+        cache = get_drive_cache(self.lookup_cache_file)
+        titles = sorted(set(titles))
+        found = {}
+        for i in range(0, len(titles), batch_size):
+            batch = titles[i:i + batch_size]
+            query = "trashed=false and ({})".format(
+                ' or '.join('title=' + _drive_quote(title) for title in batch))
+            if parent_id:
+                query += " and '{}' in parents".format(parent_id)
+            request_arguments = self._request_arguments({'q': query, 'maxResults': 1000})
+            with self.drive_client() as drive:
+                file_list = self._drive_call(drive.ListFile(request_arguments).GetList)
+            for drive_file in file_list:
+                # The first file with each title, as in find_file
+                if drive_file['title'] not in found:
+                    found[drive_file['title']] = drive_file
+                    cache.set((self.drive_id, parent_id, drive_file['title']),
+                              {k: drive_file.get(k) for k in ('id', 'title', 'mimeType')})
+        return found
+
+    def find_folder(self, title, parent_id=None):
+        """ Returns the metadata of a folder found by title, or raises ReportError. """
+        logging.info('Checking %s folder', title)
+        folder = self.find_file(title, parent_id)
+        if folder is None or folder['mimeType'] != _drive_folder_mime_type:
+            raise ReportError('Folder {} not found!'.format(title))
+        return folder
+
+    def retry_stale(self, func, *args, **kwargs):
+        """
+        Calls func, and if it fails with a 404 after using cached lookups
+        (because a cached file or folder was deleted), forgets those lookups
+        and calls func again. Both calls use the same Drive client.
+        """
+        from pydrive2.files import ApiRequestError
+        from googleapiclient.errors import HttpError
+        with self.drive_client():
+            self._cached_lookups = []
+            try:
+                return func(*args, **kwargs)
+            except (ApiRequestError, HttpError) as e:
+                if _drive_error_status(e) != 404 or not self._cached_lookups:
+                    raise
+                cache = get_drive_cache(self.lookup_cache_file)
+                for key in self._cached_lookups:
+                    cache.invalidate(key)
+                logging.info('Cached Drive lookups are stale, retrying')
+                self._cached_lookups = []
+                return func(*args, **kwargs)
+
 
 class DownloadFromGoogleDrive(FileReport, DriveMixin):
     """
@@ -1433,9 +3030,8 @@ class DownloadFromGoogleDrive(FileReport, DriveMixin):
 
     def __init__(self, *args, **kwargs):
         super(DownloadFromGoogleDrive, self).__init__(*args, **kwargs)
-        profile = self.conf['profiles'][self.profile].copy()
-        self.drive_id = self.drive_id or profile.pop('default_drive_id', None)
-        self.drive = create_drive(profile, self.grant)
+        self.drive_profile = self.conf['profiles'][self.profile].copy()
+        self.drive_id = self.drive_id or self.drive_profile.pop('default_drive_id', None)
 
     def process(self):
         """
@@ -1445,15 +3041,18 @@ class DownloadFromGoogleDrive(FileReport, DriveMixin):
         If file doesn't exists or the folder is empty it raises an error.
         Mimetype needs to be specified if we want a certain type of file.
         """
+        return self.retry_stale(self.download)
+
+    def download(self):
         # cleans the result for multiple runs
         self.result_file = None
         parent_file = None
 
         # if the file id is specified we don't need eveything else
+        fd = None
         if self.file_id:
             logging.info('Downloading file by id')
             request_arguments = self._request_arguments({'id': self.file_id})
-            fd = self._drive_call(self.drive.CreateFile, request_arguments)
         else:
             # look for folder and subfolder, if specified.
             parent_file = self.search_folder(self.folder, self.folder_id, None)
@@ -1462,19 +3061,16 @@ class DownloadFromGoogleDrive(FileReport, DriveMixin):
 
             # if filename is specified, check for existence and download it
             if self.filename:
-                query = "trashed=false and title='{}'".format(self.filename)
-                if parent_file:
-                    query += " and '{}' in parents".format(parent_file['id'])
-                request_arguments = self._request_arguments({'q': query, 'maxResults': 1})
-                file_list = self._drive_call(self.drive.ListFile(request_arguments).GetList)
-                if file_list:
-                    fd = file_list[0]
-                    logging.info('Downloading {} with id: {}'.format(fd['title'], fd['id']))
-                else:
+                fd = self.find_file(self.filename, parent_file and parent_file['id'])
+                if fd is None:
                     # File does not exist
                     raise ReportError('File {} not found!'.format(self.filename))
+                logging.info('Downloading {} with id: {}'.format(fd['title'], fd['id']))
+                request_arguments = self._request_arguments({'id': fd['id']})
             else:
                 raise ReportError('File is not specified!')
+        if not hasattr(fd, 'FetchContent'):
+            fd = self._drive_call(self.drive.CreateFile, request_arguments)
 
         # This will fail for shared drives at the moment because of PyDrive
         # not letting pass extra arguments.
@@ -1488,16 +3084,7 @@ class DownloadFromGoogleDrive(FileReport, DriveMixin):
         elif folder:
             folder = self.file_formatter.format(folder)
             # If folder is specified, verify it
-            logging.info('Checking %s folder', folder)
-            query = "trashed=false and title='{}'".format(folder)
-            if parent_folder_id:
-                query += " and '{}' in parents".format(parent_folder_id)
-            request_arguments = self._request_arguments({'q': query, 'maxResults': 1})
-            file_list = self._drive_call(self.drive.ListFile(request_arguments).GetList)
-            if file_list and file_list[0]['mimeType'] == 'application/vnd.google-apps.folder':
-                parent_file = file_list[0]
-            else:
-                raise ReportError('Folder {} not found!'.format(folder))
+            parent_file = self.find_folder(folder, parent_folder_id)
         else:
             raise ReportError('Folder and Folder id not specified.')
 
@@ -1512,17 +3099,25 @@ class UploadToGoogleDrive(FileResult, DriveMixin):
     Needs a google drive service account credentials in order to upload the
     file headlessly. If folder is specified, result is placed inside it. If
     title already exists, it's content is updated.
+
+    The file is sent in a resumable upload, in chunks of upload_chunksize
+    bytes, so a failed chunk doesn't restart the whole upload.
     """
 
     folder = None
     folder_id = None
     mime_type = None
+    upload_chunksize = 8 * 1024 * 1024
+    chunk_retries = 3
+    batch_workers = 1
+    requests_per_second = 10
+    lookup_batch_size = 50
+    existing_files = None
 
     def __init__(self, *args, **kwargs):
         super(UploadToGoogleDrive, self).__init__(*args, **kwargs)
-        profile = self.conf['profiles'][self.profile].copy()
-        self.drive_id = self.drive_id or profile.pop('default_drive_id', None)
-        self.drive = create_drive(profile, self.grant)
+        self.drive_profile = self.conf['profiles'][self.profile].copy()
+        self.drive_id = self.drive_id or self.drive_profile.pop('default_drive_id', None)
 
     def save(self):
         """
@@ -1533,54 +3128,152 @@ class UploadToGoogleDrive(FileResult, DriveMixin):
         If the file with given title and inside the given folder exists, it's
         content is updated.
         """
-        parent_file, result_file = getattr(self, 'parent_file', None), None
-        filename = self.get_filename()
+        self.retry_stale(self.upload, self.get_filename())
 
-        if not self.folder_id and parent_file is None and self.folder:
-            # If folder is specified, verify it
-            logging.info('Checking %s folder', self.folder)
-            query = "trashed=false and title='{}'".format(self.folder)
-
-            request_arguments = self._request_arguments({'q': query, 'maxResults': 1})
-            file_list = self._drive_call(self.drive.ListFile(request_arguments).GetList)
-            if file_list and file_list[0]['mimeType'] == 'application/vnd.google-apps.folder':
-                parent_file = file_list[0]
-            else:
-                raise ReportError('Folder {} not found!'.format(self.folder))
-        elif self.folder_id:
-            parent_file = {'id': self.folder_id}
+    def upload(self, filename):
+        from googleapiclient.http import MediaIoBaseUpload
+        parent_file = getattr(self, 'parent_file', None)
+        if parent_file is None:
+            parent_file = self.get_parent_file()
 
         # Checking if file already exists
-        query = "trashed=false and title='{}'".format(filename)
-        if parent_file:
-            query += " and '{}' in parents".format(parent_file['id'])
-
-        request_arguments = self._request_arguments({'q': query, 'maxResults': 1})
-        file_list = self._drive_call(self.drive.ListFile(request_arguments).GetList)
-
-        if file_list:
-            result_file = file_list[0]
+        parent_id = parent_file['id'] if parent_file else None
+        if self.existing_files is not None:
+            existing_file = self.existing_files.get(filename)
         else:
-            # File does not exist, so we create a new one
-            # In order to place it in the specified parent folder, it's id is needed
-            parents = [{'id': parent_file['id']}] if parent_file else []
-
-            base_arguments = {'title': filename, 'parents': parents, 'mimeType': self.mime_type}
-            request_arguments = self._request_arguments(base_arguments)
-
-            # Generating an io object with the spreadsheet
-            logging.info('Creating file with arguments: {}'.format(request_arguments))
-            result_file = self._drive_call(self.drive.CreateFile, request_arguments)
+            existing_file = self.find_file(filename, parent_id)
+
+        mime_type = (self.mime_type or mimetypes.guess_type(filename)[0] or
+                     'application/octet-stream')
+        with self.upload_buffer() as buf:
+            media = MediaIoBaseUpload(buf, mimetype=mime_type, resumable=True,
+                                      chunksize=int(self.upload_chunksize))
+            files = self.drive.auth.service.files()
+            if existing_file is not None:
+                request = files.update(fileId=existing_file['id'], media_body=media,
+                                       supportsAllDrives=True)
+            else:
+                # File does not exist, so we create a new one
+                # In order to place it in the specified parent folder, it's id is needed
+                parents = [{'id': parent_id}] if parent_id else []
+                base_arguments = {'title': filename, 'parents': parents, 'mimeType': mime_type}
+                request_arguments = self._request_arguments(base_arguments)
+                logging.info('Creating file with arguments: {}'.format(request_arguments))
+                request = files.insert(body=request_arguments, media_body=media,
+                                       supportsAllDrives=True)
+
+            logging.info('Uploading %s (%d bytes)', filename, media.size())
+            response = self.upload_chunks(request, media.size())
+
+        if existing_file is None:
+            get_drive_cache(self.lookup_cache_file).set(
+                (self.drive_id, parent_id, filename),
+                {k: response.get(k) for k in ('id', 'title', 'mimeType')})
+
+    def get_parent_file(self):
+        """ Returns the folder to upload the file to, or None for the root. """
+        if self.folder_id:
+            return {'id': self.folder_id}
+        if self.folder:
+            return self.find_folder(self.folder)
+        return None
+
+    @classmethod
+    def save_all(cls, results, max_workers=1):
+        """
+        Uploads several files in batch, lookup_batch_size files at a time: the
+        folder of each group of results is searched once, which of their files
+        exist is checked with a single query, and up to max_workers (or
+        batch_workers) files are uploaded at the same time, sharing a limit of
+        requests_per_second calls to the API.
+        """
+        results = iter(results)
+        first = next(results, None)
+        if first is None:
+            return
+        results = itertools.chain([first], results)
+        limiter = RateLimiter(first.requests_per_second)
+        workers = max(int(max_workers), int(first.batch_workers))
+        batch_size = int(first.lookup_batch_size)
+
+        def save(result):
+            try:
+                result.save()
+            except Exception:
+                logging.exception('Upload of %s failed', result.get_filename())
+                raise
 
-        # Generating an io object with the spreadsheet
-        logging.info('Writing the file')
+        errors, total = [], 0
+        while True:
+            batch = list(itertools.islice(results, batch_size))
+            if not batch:
+                break
+            total += len(batch)
+            cls.prepare_batch(batch, limiter)
+            outcomes = run_concurrently(save, batch, workers)
+            errors += [e for _, e in outcomes if e is not None]
 
-        string_io = self.get_buffer()
+        if errors:
+            raise ReportError('{} of {} files failed to upload: {}'.format(
+                len(errors), total, '; '.join(str(e) for e in errors)))
 
-        # Uploading the file.
-        logging.info('Uploading %s', filename)
-        result_file.content = string_io
-        self._drive_call(result_file.Upload, {'supportsAllDrives': True})
+    @classmethod
+    def prepare_batch(cls, results, limiter):
+        """
+        Finds the folders and existing files of a batch of results, so
+        they don't have to search them one by one.
+        """
+        groups = {}
+        for result in results:
+            result.rate_limiter = limiter
+            key = (result.drive_profile['name'], result.grant, result.drive_id,
+                   result.folder_id, result.folder)
+            groups.setdefault(key, []).append(result)
+
+        for group in groups.values():
+            with group[0].drive_client():
+                parent_file = group[0].get_parent_file()
+                parent_id = parent_file['id'] if parent_file else None
+                filenames = [result.get_filename() for result in group]
+                existing_files = group[0].find_files(filenames, parent_id, len(filenames))
+            logging.info('Uploading %d files, %d of them already exist', len(group),
+                         len(existing_files))
+            for result in group:
+                result.parent_file = parent_file
+                result.existing_files = existing_files
+
+    @contextmanager
+    def upload_buffer(self):
+        """
+        Yields a seekable file with the data to upload: data is rendered to a
+        temporary file instead of memory, unless it's already bytes or a buffer,
+        or it's serialized once for several results (see SerializationCache).
+        """
+        if self.raw or self.shares_serialization():
+            yield self.get_buffer()
+            return
+        with tempfile.TemporaryFile() as buf:
+            self.serialize_to(buf)
+            buf.seek(0)
+            yield buf
+
+    def upload_chunks(self, request, size):
+        """
+        Sends a resumable upload request one chunk at a time. If a chunk fails,
+        only that chunk is retried (up to chunk_retries times by the client,
+        and then with _drive_call's backoff). Returns the uploaded file's
+        metadata.
+        """
+        start, response = time.time(), None
+        while response is None:
+            status, response = self._drive_call(request.next_chunk,
+                                                num_retries=int(self.chunk_retries))
+            if status is not None:
+                elapsed = time.time() - start
+                logging.info('Uploaded %d%% (%.1f MB/s)', status.progress() * 100,
+                             status.resumable_progress / max(elapsed, 1e-3) / 2 ** 20)
+        logging.info('Uploaded %d bytes in %.1fs', size, time.time() - start)
+        return response
 
 
 class RedashResult(WriteToFile):
@@ -1596,7 +3289,9 @@ class RedashResult(WriteToFile):
         self.raw = True
 
     def save(self):
-        self.data.fillna(self.fillna, inplace=True)
+        # The report's data may be shared with other results, it's not
+        # modified in place
+        self.data = as_dataframe(self.data).fillna(self.fillna)
 
         res = {
             'columns': [{'name': c, 'friendly_name': c} for c in self.data.columns],
@@ -1608,6 +3303,125 @@ class RedashResult(WriteToFile):
         super(RedashResult, self).save()
 
 
+class S3MultipartWriter(io.RawIOBase):
+    """
+    Binary stream that uploads what's written to it as a S3 multipart upload.
+    Every part_size bytes written are uploaded as a part in a background
+    thread, while the writer produces the next ones. Up to max_concurrency
+    parts are uploaded (and kept in memory) at a time: writes wait for a part
+    to finish if there are more. Failed parts are retried up to part_retries
+    times.
+
+    Objects smaller than part_size are uploaded with a single put_object on
+    close. If the upload can't be finished, call abort to discard the parts
+    already uploaded.
+    """
+
+    def __init__(self, s3, bucket, key, part_size, max_concurrency, part_retries=3,
+                 retry_delay=1):
+        super(S3MultipartWriter, self).__init__()
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self.part_retries = part_retries
+        self.retry_delay = retry_delay
+        self.size = 0
+        self.upload_id = None
+        self._buf = bytearray()
+        self._parts = []
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = None
+        self._report = current_report()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if self.closed:
+            raise ValueError('write to closed file')
+        self._buf.extend(b)
+        self.size += len(b)
+        while len(self._buf) >= self.part_size:
+            part = bytes(self._buf[:self.part_size])
+            del self._buf[:self.part_size]
+            self._submit(part)
+        return len(b)
+
+    def _submit(self, part):
+        if self.upload_id is None:
+            response = self.s3.create_multipart_upload(Bucket=self.bucket, Key=self.key)
+            self.upload_id = response['UploadId']
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+
+        self._slots.acquire()
+        for future in self._parts:
+            if future.done() and future.exception() is not None:
+                self._slots.release()
+                raise future.exception()
+
+        future = self._executor.submit(self._upload_part, len(self._parts) + 1, part)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._parts.append(future)
+
+    def _upload_part(self, number, data):
+        with report_context(self._report):
+            for attempt in range(self.part_retries + 1):
+                try:
+                    response = self.s3.upload_part(Bucket=self.bucket, Key=self.key,
+                                                   UploadId=self.upload_id,
+                                                   PartNumber=number, Body=data)
+                    logging.debug('Uploaded part %d (%d bytes)', number, len(data))
+                    return {'ETag': response['ETag'], 'PartNumber': number}
+                except Exception as e:
+                    if attempt == self.part_retries:
+                        raise
+                    delay = self.retry_delay * 2 ** attempt
+                    logging.warning('Upload of part %d failed (%s), retrying in %ds',
+                                    number, e, delay)
+                    time.sleep(delay)
+
+    def close(self):
+        """ Uploads the remaining data and completes the upload. """
+        if self.closed:
+            return
+        try:
+            if self.upload_id is None:
+                self.s3.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buf))
+            else:
+                # The last part can be smaller than part_size
+                if self._buf:
+                    self._submit(bytes(self._buf))
+                parts = [future.result() for future in self._parts]
+                self.s3.complete_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                    MultipartUpload={'Parts': parts})
+                logging.info('Uploaded %d bytes in %d parts', self.size, len(parts))
+        except Exception:
+            self.abort()
+            raise
+        self._shutdown()
+
+    def abort(self):
+        """ Discards the upload, without writing the object. """
+        if self.closed:
+            return
+        for future in self._parts:
+            future.cancel()
+        self._shutdown()
+        if self.upload_id is not None:
+            logging.info('Aborting multipart upload of %s', self.key)
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key,
+                                           UploadId=self.upload_id)
+
+    def _shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._buf = bytearray()
+        super(S3MultipartWriter, self).close()
+
+
 class UploadToS3(FileResult):
     """
     Uploads the result to Amazon S3.
@@ -1617,7 +3431,16 @@ class UploadToS3(FileResult):
 
     The resulting object is processed as with FileReport's logic (i.e.
     converted to excel if extension is xlsx).
+
+    The file is uploaded as a multipart upload while it's serialized, in parts
+    of multipart_chunksize bytes, uploading up to max_concurrency of them at
+    the same time (see S3MultipartWriter). Excel files and raw data are read
+    from get_buffer instead, as they are not rendered progressively, and so is
+    data serialized once for several results (see SerializationCache).
     """
+    multipart_chunksize = 8 * 1024 * 1024
+    max_concurrency = 4
+    part_retries = 3
 
     def __init__(self, *args, **kwargs):
         super(UploadToS3, self).__init__(*args, **kwargs)
@@ -1630,11 +3453,23 @@ class UploadToS3(FileResult):
         self.s3 = boto3.client('s3', **self.credentials)
 
     def save(self):
-        data = self.get_buffer()
         filename = self.get_filename()
 
         logging.info('Uploading file %s to bucket %s', filename, self.bucket)
-        self.s3.put_object(Bucket=self.bucket, Key=filename, Body=data)
+        writer = S3MultipartWriter(self.s3, self.bucket, filename,
+                                   part_size=int(self.multipart_chunksize),
+                                   max_concurrency=int(self.max_concurrency),
+                                   part_retries=int(self.part_retries))
+        try:
+            if (self.raw or self.extension in self.binary_formats or
+                    self.shares_serialization()):
+                copyfileobj(self.get_buffer(), writer, writer.part_size)
+            else:
+                self.write_data(writer)
+            writer.close()
+        except Exception:
+            writer.abort()
+            raise
 
 
 class FixedColumnarResult(Result):
@@ -1643,8 +3478,8 @@ class FixedColumnarResult(Result):
     before sending them to an inner result. If a column is not present in the
     data, a column is added and filled with some value (np.nan by default).
 
-    The data is expected to be a pandas.DataFrame or be acceptable by the
-    DataFrame's constructor.
+    The data is expected to be a pandas.DataFrame, ChunkedData (columns are
+    fixed chunk by chunk) or be acceptable by the DataFrame's constructor.
     """
 
     columns = []
@@ -1653,13 +3488,17 @@ class FixedColumnarResult(Result):
     def __init__(self, conf, data, **kwargs):
         super(FixedColumnarResult, self).__init__(conf, data, **kwargs)
 
-        if not isinstance(data, pd.DataFrame):
-            data = pd.DataFrame(self.data)
-        for column in self.columns:
-            data[column] = data.get(column, self.default_value)
+        if isinstance(data, ChunkedData):
+            data = ChunkedData(self.fix_columns(chunk) for chunk in data)
+        else:
+            data = self.fix_columns(as_dataframe(data))
 
         inner_result_class = conf.get_result_class(self.inner_result_type)
-        self._inner_result = inner_result_class(conf, data[self.columns], **kwargs)
+        self._inner_result = inner_result_class(conf, data, **kwargs)
+
+    def fix_columns(self, data):
+        # Returns a new frame, the report's data may be shared with other results
+        return data.reindex(columns=self.columns, fill_value=self.default_value)
 
     def save(self):
         self._inner_result.save()
@@ -1714,30 +3553,39 @@ class PartitionedResult(Result):
     """
 
     partition_date_format = None
+    max_workers = 1
 
     def __init__(self, conf, data, **kwargs):
         super(PartitionedResult, self).__init__(conf, data, **kwargs)
-        data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.data = as_dataframe(data)
 
         if self.partition_date_format:
-            group_index = pd.to_datetime(data[self.partition_key])
-            group_index = group_index.dt.strftime(self.partition_date_format)
+            group_index = pd.to_datetime(self.data[self.partition_key])
+            self.group_index = group_index.dt.strftime(self.partition_date_format)
         else:
-            group_index = data[self.partition_key]
+            self.group_index = self.data[self.partition_key]
 
-        self._inner_results = []
+        self.result_variables = kwargs.pop('result_variables', {})
+        # Each partition has its own data, there is nothing to share
+        kwargs.pop('serialization_cache', None)
+        kwargs.pop('max_workers', None)
+        self.inner_kwargs = kwargs
 
-        result_variables = kwargs.pop('result_variables', {})
-        for group, group_data in data.groupby(group_index):
-            klass = conf.get_result_class(self.inner_result_type)
-            group_variables = result_variables.copy()
+    def iter_inner_results(self):
+        """
+        Yields the inner result of each partition. They are built as they are
+        needed, so partitions' data isn't held in memory before saving them.
+        """
+        klass = self.conf.get_result_class(self.inner_result_type)
+        for group, group_data in self.data.groupby(self.group_index):
+            group_variables = self.result_variables.copy()
             group_variables.update({'partition_group': group})
-            inner_result = klass(conf, group_data, result_variables=group_variables, **kwargs)
-            self._inner_results.append(inner_result)
+            yield klass(self.conf, group_data, result_variables=group_variables,
+                        **self.inner_kwargs)
 
     def save(self):
-        for result in self._inner_results:
-            result.save()
+        klass = self.conf.get_result_class(self.inner_result_type)
+        klass.save_all(self.iter_inner_results(), int(self.max_workers))
 
 
 class Config(dict):
@@ -1839,23 +3687,150 @@ class Config(dict):
             setattr(self, key, new_attributes.get(key, None))
 
 
+ReportStatus = namedtuple('ReportStatus', ['name', 'status', 'elapsed', 'error'])
+
+
 class Runner(object):
     """
     Runner is the responsible of running the reports and passing resulting to
     the results, the way they are configured in the given Config instance.
+
+    When running every report, up to workers reports are executed concurrently
+    in a thread pool, respecting the dependencies between them.
+
+    Runner can be used as a context manager, to release shared resources (like
+    database connections) when it exits.
     """
 
-    def __init__(self, conf, **kwargs):
+    # Report fields used by the runner that aren't passed to the report
+    _runner_fields = {'type', 'results', 'depends_on', 'result_workers'}
+
+    def __init__(self, conf, workers=1, **kwargs):
         self.conf = conf
+        self.workers = int(workers)
         self.extra_args = kwargs
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Releases resources shared between reports. """
+        dispose_engines()
+        dispose_drive_clients()
+        flush_drive_caches()
+        http_client.close_sessions()
+
     def run(self):
-        """ Runs every report for a given config """
-        for report in self.conf['reports']:
-            self.run_report(report)
+        """
+        Runs every report for a given config. A failing report doesn't stop the
+        rest of them: failures are logged, and once every report finished a
+        summary is logged and ReportError is raised if any of them failed.
+        Returns a list of ReportStatus, one for each report.
+
+        Reports may define the reports they depend on via depends_on. A report
+        starts as soon as all of its dependencies finished successfully, and is
+        skipped if any of them failed.
+        """
+        names = self.get_execution_order()
+        dependencies = self.get_dependencies()
+        statuses, running = {}, {}
+        with ThreadPoolExecutor(max_workers=max(self.workers, 1)) as executor:
+            pending = list(names)
+            while pending or running:
+                # Pending reports are kept in topological order, so a report
+                # skipped here is already seen by its dependents in this pass
+                for name in list(pending):
+                    upstream = dependencies[name]
+                    failed = [u for u in upstream if u in statuses and statuses[u].status != 'success']
+                    if failed:
+                        error = ReportError('Dependencies failed: {}'.format(', '.join(failed)))
+                        statuses[name] = ReportStatus(name, 'skipped', 0, error)
+                        pending.remove(name)
+                    elif all(u in statuses for u in upstream):
+                        running[executor.submit(self._run_isolated, name)] = name
+                        pending.remove(name)
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    status = future.result()
+                    statuses[status.name] = status
+                    del running[future]
+
+        summary = [statuses[name] for name in self.conf['reports']]
+        self.log_summary(summary)
+
+        failed = [s.name for s in summary if s.status != 'success']
+        if failed:
+            raise ReportError('Failed reports: {}'.format(', '.join(failed)))
+        return summary
+
+    def get_dependencies(self):
+        """
+        Returns a dictionary with the list of reports each report depends on,
+        as defined in its depends_on field.
+        """
+        dependencies = {}
+        for name, report in self.conf['reports'].items():
+            upstream = report.get('depends_on') or []
+            if isinstance(upstream, six.string_types):
+                upstream = [upstream]
+            for dependency in upstream:
+                if dependency not in self.conf['reports']:
+                    raise ReportError('Report {} depends on unknown report {}!'.format(
+                        name, dependency))
+            dependencies[name] = list(upstream)
+        return dependencies
+
+    def get_execution_order(self):
+        """
+        Returns report names sorted so every report comes after the reports it
+        depends on, keeping configuration order otherwise. Raises ReportError
+        if dependencies have cycles.
+        """
+        dependencies = self.get_dependencies()
+        order, visited = [], set()
+        remaining = list(self.conf['reports'])
+        while remaining:
+            ready = [n for n in remaining if all(d in visited for d in dependencies[n])]
+            if not ready:
+                raise ReportError('Reports dependencies have a cycle: {}'.format(
+                    ', '.join(remaining)))
+            for name in ready:
+                order.append(name)
+                visited.add(name)
+                remaining.remove(name)
+        return order
+
+    def _run_isolated(self, name):
+        """ Runs a report, catching and logging any exception it raises. """
+        start = time.time()
+        with report_context(name):
+            try:
+                self.run_report(name)
+            except Exception as e:
+                logging.exception('Report %s failed', name)
+                return ReportStatus(name, 'failed', time.time() - start, e)
+        return ReportStatus(name, 'success', time.time() - start, None)
+
+    def log_summary(self, summary):
+        """ Logs the status and duration of each executed report. """
+        logging.info('Finished running %d reports:', len(summary))
+        for status in summary:
+            error = ': {}'.format(status.error) if status.error is not None else ''
+            logging.info('  %s - %s in %.1fs%s', status.name, status.status,
+                         status.elapsed, error)
 
     def run_report(self, name):
         """ Runs a report for a given report name. """
+        with report_context(name):
+            self._run_report(name)
+
+    def _run_report(self, name):
         logging.info('Running report %s', name)
         report = self.conf['reports'][name]
         if report is None:
@@ -1873,16 +3848,76 @@ class Runner(object):
                 raise ReportError('Result type {} does not exist!'.format(conf['type']))
             result_configs.append((result_class, conf))
 
-        args = {k: v for k, v in report.items() if k not in {'type', 'results'}}
+        args = {k: v for k, v in report.items() if k not in self._runner_fields}
         args.update(self.extra_args)
         data = report_class(self.conf, **args).process()
 
         if isinstance(data, pd.DataFrame):
             num_rows, num_columns = data.shape
             logging.info('The report has %s rows x %s columns', num_rows, num_columns)
-
-        for result_class, conf in result_configs:
-            logging.info('Saving a result of type %s', conf['type'])
+        elif isinstance(data, ChunkedData):
+            logging.info('The report returns its data in chunks')
+
+        result_workers = int(report.get('result_workers', 1))
+        payload = None
+        if result_workers > 1 and is_buffer(data) and has_fileno(data):
+            # Files (like downloaded temporary files) are memory mapped
+            # instead of read to memory, so results can share them
+            mapped = map_fileobj(data)
+            data.close()
+            data = mapped
+        forkable = hasattr(data, 'fork')
+        if result_workers > 1 and is_buffer(data) and not forkable:
+            # Concurrent results can't share the position of the same buffer,
+            # so each one of them gets its own buffer over the same contents
+            data.seek(0)
+            payload = data.read()
+            io_class = six.StringIO if isinstance(payload, six.text_type) else six.BytesIO
+
+        def build(result_config):
+            result_class, conf = result_config
             args = {k: v for k, v in conf.items() if k not in {'type'}}
             args.update(self.extra_args)
-            result_class(self.conf, data, **args).save()
+            if forkable and result_workers > 1:
+                result_data = data.fork()
+            else:
+                result_data = data if payload is None else io_class(payload)
+            return result_class(self.conf, result_data, **args)
+
+        results = []
+        for result_config in result_configs:
+            try:
+                results.append((build(result_config), None))
+            except Exception as e:
+                logging.exception('Result of type %s failed', result_config[1]['type'])
+                results.append((None, e))
+
+        # Results with the same file settings serialize the data only once.
+        # The rest can stream it instead.
+        serialization_cache = SerializationCache()
+        serialization_cache.share(result for result, _ in results if result is not None)
+
+        def save(item):
+            (_, conf), (result, error) = item
+            if error is not None:
+                raise error
+            logging.info('Saving a result of type %s', conf['type'])
+            try:
+                result.save()
+            except Exception:
+                logging.exception('Result of type %s failed', conf['type'])
+                raise
+            finally:
+                serialization_cache.release(result)
+
+        try:
+            outcomes = run_concurrently(save, list(zip(result_configs, results)), result_workers)
+        finally:
+            if isinstance(data, MemoryReader):
+                # Unmap memory mapped files once every result used them
+                data.close()
+        errors = [(conf['type'], e) for (_, conf), (_, e) in zip(result_configs, outcomes) if e]
+        if errors:
+            raise ReportError('{} of {} results failed: {}'.format(
+                len(errors), len(result_configs),
+                '; '.join('{}: {}'.format(t, e) for t, e in errors)))
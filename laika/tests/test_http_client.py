@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from laika import http_client
+from laika.reports import Config, HTTPMixin
+
+
+class HTTPReport(HTTPMixin):
+
+    def __init__(self, conf, **kwargs):
+        self.conf = conf
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class HTTPClientTest(TestCase):
+
+    def tearDown(self):
+        http_client.close_sessions()
+
+    def test_sessions_are_shared_per_host_and_options(self):
+        session = http_client.get_session('example.com')
+        self.assertIs(session, http_client.get_session('example.com'))
+        self.assertIsNot(session, http_client.get_session('other.com'))
+        self.assertIsNot(session, http_client.get_session('example.com', pool_maxsize=20))
+
+        adapter = session.get_adapter('https://example.com/')
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+
+    def test_unknown_option(self):
+        with self.assertRaises(ValueError):
+            http_client.get_session('example.com', pool_sise=20)
+
+    def test_options_from_profile_and_report(self):
+        conf = Config({
+            'profiles': [{'name': 'api', 'http': {'max_retries': 5, 'timeout': 10}}],
+            'connections': [],
+            'reports': []
+        })
+        report = HTTPReport(conf, profile='api', http={'timeout': 30})
+        session = report.get_session('https://api.example.com/v1', max_retries=1)
+
+        self.assertEqual(session.timeout, 30)
+        self.assertEqual(session.get_adapter('https://api.example.com').max_retries.total, 5)
+
+    def test_sessions_are_scoped_by_profile_or_report(self):
+        conf = Config({'profiles': [{'name': 'a'}, {'name': 'b'}], 'connections': [],
+                       'reports': []})
+        url = 'https://api.example.com'
+        session = HTTPReport(conf, profile='a', name='one').get_session(url)
+
+        self.assertIs(session, HTTPReport(conf, profile='a', name='two').get_session(url))
+        self.assertIsNot(session, HTTPReport(conf, profile='b', name='one').get_session(url))
+        self.assertIsNot(HTTPReport(conf, name='one').get_session(url),
+                         HTTPReport(conf, name='two').get_session(url))
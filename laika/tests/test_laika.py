@@ -1,5 +1,8 @@
 
+import os
+import shutil
 import six
+import tempfile
 import pandas as pd
 from unittest import TestCase
 
@@ -8,7 +11,8 @@ try:
 except ImportError:
     from mock import patch, MagicMock, mock_open
 
-from laika.reports import Config, Runner
+from laika.reports import (BasicReport, Config, MemoryReader, Runner, ReportError, Result,
+                           dispose_engines)
 
 
 class LaikaTest(TestCase):
@@ -46,6 +50,7 @@ class LaikaTest(TestCase):
         patch.dict("sys.modules", sqlalchemy=self.sqlalchemy_p).start()
 
     def tearDown(self):
+        dispose_engines()
         patch.stopall()
 
     def test_simple_report(self):
@@ -66,3 +71,148 @@ class LaikaTest(TestCase):
         self.pd_sql_query.assert_called_once_with(query, con=expected_con)
 
         self.pd_sql_query.return_value.to_csv.assert_called_once_with('report.csv', encoding='utf-8', float_format=None, header=True, index=True)
+
+    def test_run_isolates_failures(self):
+        self.config['reports'].append({
+            'name': 'broken_report',
+            'type': 'bash',
+            'script': 'false',
+            'result_type': 'unknown',
+            'results': []
+        })
+        config = Config(self.config)
+
+        self.pd_sql_query.return_value = pd.DataFrame([[1, 1], [2, 2]])
+        open_s = six.moves.builtins.__name__
+        with patch(open_s + '.open', mock_open(read_data='select 1;')), \
+                patch('subprocess.Popen') as popen:
+            popen.return_value.communicate.return_value = (b'', None)
+            runner = Runner(config, workers=2)
+            with self.assertRaises(ReportError) as ctx:
+                runner.run()
+
+        self.assertIn('broken_report', str(ctx.exception))
+        self.pd_sql_query.assert_called_once()
+
+    def test_dependencies_order(self):
+        self.config['reports'] = [
+            {'name': 'c', 'type': 'bash', 'depends_on': ['a', 'b'], 'results': []},
+            {'name': 'b', 'type': 'bash', 'depends_on': 'a', 'results': []},
+            {'name': 'a', 'type': 'bash', 'results': []},
+            {'name': 'd', 'type': 'bash', 'results': []},
+        ]
+        runner = Runner(Config(self.config))
+        self.assertEqual(runner.get_execution_order(), ['a', 'd', 'b', 'c'])
+
+    def test_dependencies_cycle(self):
+        self.config['reports'] = [
+            {'name': 'a', 'type': 'bash', 'depends_on': 'b', 'results': []},
+            {'name': 'b', 'type': 'bash', 'depends_on': 'a', 'results': []},
+        ]
+        runner = Runner(Config(self.config))
+        self.assertRaises(ReportError, runner.run)
+
+    def test_dependencies_skipped_on_failure(self):
+        self.config['reports'] = [
+            {'name': 'a', 'type': 'bash', 'script': 'false', 'result_type': 'unknown', 'results': []},
+            {'name': 'b', 'type': 'bash', 'script': 'true', 'result_type': 'raw', 'depends_on': 'a',
+             'results': []},
+        ]
+        runner = Runner(Config(self.config), workers=2)
+        with patch('subprocess.Popen') as popen:
+            popen.return_value.communicate.return_value = (b'', None)
+            with self.assertRaises(ReportError):
+                runner.run()
+        popen.assert_called_once_with(['false'], stdout=-1)
+
+    def test_failed_result_does_not_stop_the_rest(self):
+        self.config['reports'] = [{
+            'name': 'a', 'type': 'bash', 'script': 'true', 'result_type': 'raw', 'result_workers': 2,
+            'results': [{'type': 'test', 'fail': True}, {'type': 'test', 'fail': False}]
+        }]
+        saved = []
+
+        class TestResult(Result):
+            def save(self):
+                if self.fail:
+                    raise IOError('Disk full')
+                saved.append(self.data.read())
+
+        runner = Runner(Config(self.config))
+        with patch('subprocess.Popen') as popen, patch.dict(Config._result_map, test=TestResult):
+            popen.return_value.communicate.return_value = (six.BytesIO(b'data'), None)
+            with self.assertRaises(ReportError) as ctx:
+                runner.run_report('a')
+
+        self.assertIn('Disk full', str(ctx.exception))
+        self.assertEqual(saved, [b'data'])
+
+    def test_concurrent_results_share_mapped_file(self):
+        self.config['reports'] = [{
+            'name': 'a', 'type': 'bash', 'script': 'true', 'result_type': 'raw', 'result_workers': 2,
+            'results': [{'type': 'test'}, {'type': 'test'}]
+        }]
+        saved = []
+
+        class TestResult(Result):
+            def save(self):
+                saved.append((type(self.data), self.data.read()))
+
+        downloaded = tempfile.TemporaryFile()
+        downloaded.write(b'data')
+        runner = Runner(Config(self.config))
+        with patch('subprocess.Popen') as popen, patch.dict(Config._result_map, test=TestResult):
+            popen.return_value.communicate.return_value = (downloaded, None)
+            runner.run_report('a')
+
+        self.assertEqual(saved, [(MemoryReader, b'data')] * 2)
+        self.assertTrue(downloaded.closed)
+
+    def test_engine_is_shared(self):
+        self.config['connections'][0].update({'pool_size': 2, 'pool_pre_ping': True})
+        self.config['reports'].append(dict(self.config['reports'][0], name='another_query'))
+        config = Config(self.config)
+
+        self.pd_sql_query.return_value = pd.DataFrame([[1, 1], [2, 2]])
+        open_s = six.moves.builtins.__name__
+        with patch(open_s + '.open', mock_open(read_data='select 1;')):
+            with Runner(config) as runner:
+                runner.run()
+
+        constring = self.config['connections'][0]['constring']
+        self.sqlalchemy_p.create_engine.assert_called_once_with(constring, pool_size=2,
+                                                                pool_pre_ping=True)
+        self.sqlalchemy_p.create_engine.return_value.dispose.assert_called_once_with()
+
+
+class ConcurrentResultsTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_results_dont_modify_shared_data(self):
+        data = pd.DataFrame({'a': [1, None]})
+
+        class TestReport(BasicReport):
+            def process(self):
+                return data
+
+        fixed_path = os.path.join(self.directory, 'fixed.csv')
+        file_path = os.path.join(self.directory, 'data.csv')
+        config = Config({'profiles': [], 'connections': [], 'reports': [{
+            'name': 'a', 'type': 'test', 'result_workers': 2,
+            'results': [
+                {'type': 'fixed', 'columns': ['a', 'zz'], 'inner_result_type': 'file',
+                 'filename': fixed_path, 'index': False},
+                {'type': 'file', 'filename': file_path, 'index': False}
+            ]
+        }]})
+        with patch.dict(Config._report_map, test=TestReport):
+            Runner(config).run_report('a')
+
+        self.assertEqual(list(data.columns), ['a'])
+        self.assertEqual(list(pd.read_csv(file_path).columns), ['a'])
+        self.assertEqual(list(pd.read_csv(fixed_path).columns), ['a', 'zz'])
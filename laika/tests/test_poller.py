@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+try:
+    from unittest.mock import patch, Mock
+except ImportError:
+    from mock import patch, Mock
+
+from laika.reports import Poller, ReportError
+
+
+class PollerTest(TestCase):
+
+    def setUp(self):
+        self.sleep = patch('time.sleep').start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    def test_exponential_backoff(self):
+        check = Mock(side_effect=[(False, None)] * 4 + [(True, None)])
+        poller = Poller(initial_delay=1, max_delay=5, backoff=2, jitter=0)
+        poller.poll(check)
+
+        self.assertEqual([c[0][0] for c in self.sleep.call_args_list], [1, 2, 4, 5])
+        self.assertEqual(poller.polls, 5)
+        self.assertEqual(poller.waited, 12)
+
+    def test_progress_shortens_wait(self):
+        check = Mock(side_effect=[(False, 90), (True, 100)])
+        poller = Poller(initial_delay=1, max_delay=60, jitter=0)
+        with patch('time.time', Mock(side_effect=[0, 90, 91])):
+            poller.poll(check)
+
+        # 90% took 90 seconds, so it should be done in 10 more
+        self.sleep.assert_called_once_with(10)
+
+    def test_max_polls(self):
+        check = Mock(return_value=(False, None))
+        poller = Poller(max_polls=3)
+        self.assertRaises(ReportError, poller.poll, check)
+        self.assertEqual(check.call_count, 3)
+
+    def test_timeout(self):
+        check = Mock(return_value=(False, None))
+        poller = Poller(timeout=10, jitter=0)
+        with patch('time.time', Mock(side_effect=[0, 1, 5, 12])):
+            self.assertRaises(ReportError, poller.poll, check)
+        self.assertEqual(check.call_count, 3)
@@ -0,0 +1,235 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase, skipIf
+
+import pandas as pd
+
+try:
+    from unittest.mock import patch, Mock
+except ImportError:
+    from mock import patch, Mock
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from laika.reports import (ChunkedData, Config, DownloadFromS3, FacebookInsightsReport,
+                           FileReport, GoogleAdsReport, MemoryReader, ReportError, WriteToFile,
+                           field_accessor)
+
+
+class FileReportPatternTest(TestCase):
+
+    def setUp(self):
+        self.conf = Config({'profiles': [], 'connections': [], 'reports': []})
+        self.directory = tempfile.mkdtemp()
+        for i in range(3):
+            with open(self.path('part-{}.csv'.format(i)), 'w') as f:
+                f.write('a,b\n{},x\n'.format(i))
+        with open(self.path('other.csv'), 'w') as f:
+            f.write('a,b\n9,y\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_concatenate_parts(self):
+        report = FileReport(self.conf, filename=self.path('part-*.csv'), max_workers=2,
+                            source_column='source')
+        data = report.process()
+
+        self.assertEqual(list(data['a']), [0, 1, 2])
+        self.assertEqual(list(data['source']),
+                         [self.path('part-{}.csv'.format(i)) for i in range(3)])
+
+    def test_stream_parts(self):
+        report = FileReport(self.conf, filename=self.path('part-*.csv'), stream=True)
+        data = report.process()
+
+        self.assertIsInstance(data, ChunkedData)
+        self.assertEqual([len(chunk) for chunk in data], [1, 1, 1])
+
+    def test_modified_since(self):
+        old = time.time() - 2 * 24 * 60 * 60
+        os.utime(self.path('part-0.csv'), (old, old))
+        report = FileReport(self.conf, filename=self.path('part-*.csv'),
+                            modified_since='{t-1d}')
+
+        self.assertEqual(list(report.process()['a']), [1, 2])
+
+    def test_no_matches_and_raw(self):
+        with self.assertRaises(ReportError):
+            FileReport(self.conf, filename=self.path('missing-*.csv')).process()
+        with self.assertRaises(ReportError):
+            FileReport(self.conf, filename=self.path('part-*.csv'), raw=True).process()
+
+    def test_literal_name_with_wildcards(self):
+        with open(self.path('report[1].csv'), 'w') as f:
+            f.write('a,b\n5,z\n')
+        report = FileReport(self.conf, filename=self.path('report[1].csv'))
+
+        self.assertFalse(report.is_pattern())
+        self.assertEqual(list(report.process()['a']), [5])
+        report = FileReport(self.conf, filename=self.path('report[1].csv'), pattern=True)
+        self.assertTrue(report.is_pattern())
+
+    def test_compressed_parts_and_columns(self):
+        with gzip.open(self.path('part-3.csv.gz'), 'wb') as f:
+            f.write(b'a,b\n3,z\n')
+        report = FileReport(self.conf, filename=self.path('part-*.csv.gz'), columns=['b'])
+
+        self.assertEqual(report.process().to_dict('list'), {'b': ['z']})
+
+    def test_raw_file_is_mapped(self):
+        data = FileReport(self.conf, filename=self.path('other.csv'), raw=True).process()
+
+        self.assertIsInstance(data, MemoryReader)
+        self.assertEqual(data.read(), b'a,b\n9,y\n')
+        fork = data.fork()
+        self.assertEqual(fork.read(3), b'a,b')
+
+        open(self.path('empty.txt'), 'w').close()
+        empty = FileReport(self.conf, filename=self.path('empty.txt'), raw=True).process()
+        self.assertEqual(empty.read(), b'')
+
+        WriteToFile(self.conf, data, filename=self.path('copy.csv')).save()
+        with open(self.path('copy.csv'), 'rb') as f:
+            self.assertEqual(f.read(), b'a,b\n9,y\n')
+
+        fork.close()
+        data.close()
+        self.assertTrue(data._data.closed)
+
+
+@skipIf(pyarrow is None, 'pyarrow is not installed')
+class ArrowFilesTest(TestCase):
+
+    def setUp(self):
+        self.conf = Config({'profiles': [], 'connections': [], 'reports': []})
+        self.directory = tempfile.mkdtemp()
+        self.data = pd.DataFrame({'a': [1, 2, 3], 'b': [u'x', u'y', u'\xf1']})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def round_trip(self, data, filename, **kwargs):
+        path = os.path.join(self.directory, filename)
+        WriteToFile(self.conf, data, filename=path, index=False).save()
+        return FileReport(self.conf, filename=path, **kwargs).process()
+
+    def test_parquet(self):
+        pd.testing.assert_frame_equal(self.round_trip(self.data, 'out.parquet'), self.data)
+        data = self.round_trip(self.data, 'out.parquet', columns=['b'],
+                               filters=[('a', '>', 1)])
+        self.assertEqual(list(data['b']), [u'y', u'\xf1'])
+
+    def test_feather(self):
+        pd.testing.assert_frame_equal(self.round_trip(self.data, 'out.feather'), self.data)
+
+    def test_chunked_parquet(self):
+        chunks = [self.data.iloc[:2], self.data.iloc[2:]]
+        data = self.round_trip(ChunkedData(chunks), 'out.parquet')
+        pd.testing.assert_frame_equal(data, self.data)
+
+    def test_chunked_parquet_with_different_types(self):
+        # Nulls make pandas read the int column of the second chunk as float
+        chunks = [pd.DataFrame({'a': [1, 2]}), pd.DataFrame({'a': [None, 4]})]
+        data = self.round_trip(ChunkedData(chunks), 'out.parquet')
+        self.assertEqual(data['a'].isnull().tolist(), [False, False, True, False])
+        self.assertEqual(data['a'].dropna().tolist(), [1, 2, 4])
+
+
+class DownloadFromS3Test(TestCase):
+
+    @patch('laika.reports.get_json_credentials', return_value={'aws_access_key_id': 'key'})
+    def test_wildcards_match_one_segment(self, credentials):
+        conf = Config({'profiles': [], 'connections': [], 'reports': []})
+        with patch.dict('sys.modules', boto3=Mock()):
+            report = DownloadFromS3(conf, bucket='bucket', filename='events/*/part-?.csv')
+        keys = ['events/a/part-1.csv', 'events/a/b/part-2.csv', 'events/b/part-10.csv',
+                'events/c/part-3.csv']
+        report.s3.get_paginator.return_value.paginate.return_value = [
+            {'Contents': [{'Key': key} for key in keys]}]
+
+        self.assertEqual(report.list_parts(), ['events/a/part-1.csv', 'events/c/part-3.csv'])
+
+
+class GoogleAdsReportTest(TestCase):
+
+    def setUp(self):
+        self.conf = Config({'profiles': [{'name': 'ads', 'env_variable': 'ADS_CREDENTIALS'}],
+                            'connections': [], 'reports': []})
+
+    @patch.dict(os.environ, {'ADS_CREDENTIALS': 'developer_token: abc'})
+    def test_empty_result(self):
+        report = GoogleAdsReport(self.conf, profile='ads', customer_id='123', query='q',
+                                 header='Title', fieldnames=['Campaign', 'Clicks'])
+        service = Mock()
+        service.search_stream.return_value = []
+
+        self.assertEqual(report.fetch_csv(service), b'Title\nCampaign,Clicks\r\n')
+        self.assertEqual(b''.join(report.iter_csv(service)), b'Title\nCampaign,Clicks\r\n')
+
+        report = GoogleAdsReport(self.conf, profile='ads', customer_id='123', query='q')
+        self.assertEqual(report.fetch_csv(service), b'')
+        self.assertEqual(b''.join(report.iter_csv(service)), b'')
+
+    @patch.dict(os.environ, {'ADS_CREDENTIALS': 'developer_token: abc'})
+    def test_rows_end_with_crlf(self):
+        report = GoogleAdsReport(self.conf, profile='ads', customer_id='123', query='q')
+
+        class Campaign(object):
+            def __init__(self, name):
+                self.name = name
+
+        messages = [Mock(spec=['campaign'], campaign=Campaign(name)) for name in ('a', 'b')]
+        service = Mock()
+        service.search_stream.return_value = [Mock(results=messages,
+                                                   field_mask=Mock(paths=['campaign.name']))]
+
+        expected = b'campaign.name\r\na\r\nb\r\n'
+        self.assertEqual(report.fetch_csv(service), expected)
+        self.assertEqual(b''.join(report.iter_csv(service)), expected)
+
+    def test_field_accessor(self):
+        import enum
+        Status = enum.Enum('Status', 'ENABLED PAUSED')
+
+        class ProtoPlusCampaign(object):
+            _pb = None
+            type_ = Status.PAUSED
+
+        class Campaign(object):
+            type = 2
+
+        message = Mock(_pb=None, campaign=ProtoPlusCampaign())
+        self.assertEqual(field_accessor(message, 'campaign.type')(message), 'PAUSED')
+
+        message = Mock(spec=['campaign'], campaign=Campaign())
+        self.assertEqual(field_accessor(message, 'campaign.type')(message), 2)
+
+
+class FacebookInsightsReportTest(TestCase):
+
+    @patch.dict(os.environ, {'FB_CREDENTIALS': '{"access_token": "token"}'})
+    def setUp(self):
+        conf = Config({'profiles': [{'name': 'fb', 'env_variable': 'FB_CREDENTIALS'}],
+                       'connections': [], 'reports': []})
+        self.report = FacebookInsightsReport(conf, profile='fb', object_id='123', params={})
+        self.report.session = Mock()
+
+    @patch('time.sleep')
+    def test_submit_job_waits_for_request_limit(self, sleep):
+        limited = Mock(**{'json.return_value': {'error': {'code': 17, 'message': 'limit'}}})
+        submitted = Mock(**{'json.return_value': {'report_run_id': 'job'}})
+        self.report.session.request.side_effect = [limited, submitted]
+
+        self.assertEqual(self.report.submit_job(('123', None)), 'job')
+        sleep.assert_called_once_with(61)
+        self.assertEqual(self.report.session.request.call_args[0][0], 'POST')
@@ -0,0 +1,478 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import pandas as pd
+from unittest import TestCase
+
+try:
+    from unittest.mock import patch, Mock
+except ImportError:
+    from mock import patch, Mock
+
+from laika.reports import (ChunkedData, Config, DriveLookupCache, DriveMixin, FileResult,
+                           ModuleResult, PartitionedResult, RateLimiter, ReportError, Result,
+                           S3MultipartWriter, SerializationCache, StreamingBuffer,
+                           UploadToGoogleDrive, UploadToS3, checkout_drive, dispose_drive_clients)
+
+
+class FileResultTest(TestCase):
+
+    def setUp(self):
+        self.data = pd.DataFrame({'a': [1, 2], 'b': [u'x', u'\xf1']})
+
+    def test_get_buffer_csv(self):
+        result = FileResult({}, self.data, filename='out.csv', index=False)
+        self.assertEqual(result.get_buffer().read(), u'a,b\n1,x\n2,\xf1\n'.encode('utf-8'))
+
+    def test_serialization_is_shared(self):
+        cache = SerializationCache()
+        results = [FileResult({}, self.data, filename=name, serialization_cache=cache)
+                   for name in ('one.csv', 'two.csv')]
+
+        with patch.object(pd.DataFrame, 'to_csv', wraps=self.data.to_csv) as to_csv:
+            contents = [result.get_buffer().read() for result in results]
+
+        self.assertEqual(to_csv.call_count, 1)
+        self.assertEqual(contents[0], contents[1])
+
+    def test_serialization_depends_on_settings(self):
+        cache = SerializationCache()
+        with_index = FileResult({}, self.data, filename='out.csv', serialization_cache=cache)
+        without_index = FileResult({}, self.data, filename='out.csv', index=False,
+                                   serialization_cache=cache)
+
+        self.assertNotEqual(with_index.get_buffer().read(), without_index.get_buffer().read())
+
+    def test_share_serialization(self):
+        cache = SerializationCache()
+        csv, tsv, other_csv = [FileResult({}, self.data, filename=name)
+                               for name in ('a.csv', 'b.tsv', 'c.csv')]
+        cache.share([csv, tsv, other_csv])
+
+        self.assertIsNone(tsv.serialization_cache)
+        self.assertTrue(csv.shares_serialization() and other_csv.shares_serialization())
+
+        with patch.object(FileResult, 'serialize', wraps=csv.serialize) as serialize:
+            csv.get_buffer()
+            cache.release(csv)
+            other_csv.get_buffer()
+            cache.release(other_csv)
+            csv.get_buffer()
+        # Contents are dropped once both results released them
+        self.assertEqual(serialize.call_count, 2)
+
+    def test_gzip_csv(self):
+        result = FileResult({}, self.data, filename='out.csv.gz', index=False,
+                            compression_level=1)
+        contents = gzip.GzipFile(fileobj=result.get_buffer()).read()
+        self.assertEqual(contents, u'a,b\n1,x\n2,\xf1\n'.encode('utf-8'))
+
+    def test_compressed_binary_format(self):
+        with self.assertRaises(ReportError):
+            FileResult({}, self.data, filename='out.xlsx.gz')
+
+    def test_get_buffer_raw(self):
+        buf = FileResult({}, memoryview(b'abcdef'), filename='out.bin').get_buffer()
+        self.assertEqual(buf.read(2), b'ab')
+        self.assertEqual(buf.read(), b'cdef')
+        buf.seek(0)
+        self.assertEqual(buf.read(), b'abcdef')
+
+
+class ChunkedDataTest(TestCase):
+
+    def setUp(self):
+        self.data = pd.DataFrame({'a': [1, 2, 3], 'b': [u'x', u'y', u'\xf1']})
+        self.chunks = [self.data.iloc[:2], self.data.iloc[2:]]
+
+    def test_iterate_twice(self):
+        data = ChunkedData(iter(self.chunks))
+        for _ in range(2):
+            chunks = list(data)
+            self.assertEqual(len(chunks), 2)
+            pd.testing.assert_frame_equal(pd.concat(chunks), self.data)
+
+    def test_resume_stopped_iteration(self):
+        data = ChunkedData(iter(self.chunks))
+        for chunk in data:
+            break
+        pd.testing.assert_frame_equal(data.to_frame(), self.data)
+
+    def test_interleaved_iterations(self):
+        data = ChunkedData(iter(self.chunks))
+        first, second = iter(data), iter(data)
+        next(first)
+        # A partly consumed iteration doesn't block the rest
+        self.assertEqual(len(list(second)), 2)
+        self.assertEqual(len(list(first)), 1)
+
+    def test_get_buffer(self):
+        for extension in ('csv', 'tsv'):
+            expected = FileResult({}, self.data, filename='out.' + extension).get_buffer().read()
+            result = FileResult({}, ChunkedData(self.chunks), filename='out.' + extension)
+            self.assertEqual(result.get_buffer().read(), expected)
+
+
+class ModuleResultTest(TestCase):
+
+    def test_chunks_are_concatenated(self):
+        fd, path = tempfile.mkstemp(suffix='.py')
+        with os.fdopen(fd, 'w') as f:
+            f.write('from laika.reports import Result\n\n\n'
+                    'class CustomResult(Result):\n'
+                    '    saved = []\n\n'
+                    '    def save(self):\n'
+                    '        self.saved.append(self.data.shape)\n')
+        try:
+            data = ChunkedData(iter([pd.DataFrame({'a': [1]}), pd.DataFrame({'a': [2]})]))
+            ModuleResult({}, data, result_file=path, result_class='CustomResult').save()
+        finally:
+            os.remove(path)
+
+        module = sys.modules[os.path.basename(path).split('.')[0]]
+        self.assertEqual(module.CustomResult.saved, [(2, 1)])
+
+
+class StreamingBufferTest(TestCase):
+
+    def test_read_lazily(self):
+        chunks = iter([b'abc', b'def', b'ghi'])
+        data = StreamingBuffer(chunks)
+        self.assertEqual(data.read(4), b'abcd')
+        self.assertEqual(next(chunks), b'ghi')
+        self.assertEqual(data.read(), b'ef')
+
+    def test_rewind_and_fork(self):
+        data = StreamingBuffer(iter([b'abc', b'def']))
+        fork = data.fork()
+        self.assertEqual(data.read(), b'abcdef')
+        self.assertEqual(fork.read(2), b'ab')
+        data.seek(0)
+        self.assertEqual(data.read(), b'abcdef')
+        self.assertEqual(fork.read(), b'cdef')
+
+    def test_file_result(self):
+        data = StreamingBuffer(iter([b'a,b\n', b'1,2\n']))
+        result = FileResult({}, data, filename='out.csv')
+        self.assertTrue(result.raw)
+        self.assertEqual(result.get_buffer().read(), b'a,b\n1,2\n')
+
+
+class S3MultipartWriterTest(TestCase):
+
+    def setUp(self):
+        self.s3 = Mock()
+        self.s3.create_multipart_upload.return_value = {'UploadId': 'upload'}
+        self.s3.upload_part.side_effect = lambda **kwargs: {
+            'ETag': 'etag{}'.format(kwargs['PartNumber'])}
+
+    def test_small_object(self):
+        writer = S3MultipartWriter(self.s3, 'bucket', 'key', part_size=10, max_concurrency=2)
+        writer.write(b'abc')
+        writer.close()
+
+        self.s3.put_object.assert_called_once_with(Bucket='bucket', Key='key', Body=b'abc')
+        self.s3.create_multipart_upload.assert_not_called()
+
+    def test_parts(self):
+        writer = S3MultipartWriter(self.s3, 'bucket', 'key', part_size=4, max_concurrency=2)
+        for _ in range(5):
+            writer.write(b'abc')
+        writer.close()
+
+        bodies = sorted((c[1]['PartNumber'], c[1]['Body'])
+                        for c in self.s3.upload_part.call_args_list)
+        self.assertEqual(bodies, [(1, b'abca'), (2, b'bcab'), (3, b'cabc'), (4, b'abc')])
+        parts = self.s3.complete_multipart_upload.call_args[1]['MultipartUpload']['Parts']
+        self.assertEqual([p['PartNumber'] for p in parts], [1, 2, 3, 4])
+
+    def test_failed_part_is_retried(self):
+        self.s3.upload_part.side_effect = [Exception('timeout'), {'ETag': 'etag'}]
+        writer = S3MultipartWriter(self.s3, 'bucket', 'key', part_size=4, max_concurrency=1,
+                                   retry_delay=0)
+        writer.write(b'abcd')
+        writer.close()
+
+        self.assertEqual(self.s3.upload_part.call_count, 2)
+        self.s3.complete_multipart_upload.assert_called_once()
+
+    def test_abort_on_failure(self):
+        self.s3.upload_part.side_effect = Exception('denied')
+        writer = S3MultipartWriter(self.s3, 'bucket', 'key', part_size=4, max_concurrency=1,
+                                   part_retries=0)
+        writer.write(b'abcdef')
+        with self.assertRaises(Exception):
+            writer.close()
+
+        self.s3.abort_multipart_upload.assert_called_once_with(
+            Bucket='bucket', Key='key', UploadId='upload')
+        self.s3.complete_multipart_upload.assert_not_called()
+
+
+class UploadToS3Test(TestCase):
+
+    @patch('laika.reports.get_json_credentials', return_value={'aws_access_key_id': 'key'})
+    def test_upload_shared_serialization(self, credentials):
+        conf = Config({'profiles': [], 'connections': [], 'reports': []})
+        data = pd.DataFrame({'a': [1, 2]})
+        cache = SerializationCache()
+        with patch.dict('sys.modules', boto3=Mock()):
+            result = UploadToS3(conf, data, filename='out.csv', bucket='bucket',
+                                serialization_cache=cache)
+        other = FileResult(conf, data, filename='out.csv', serialization_cache=cache)
+
+        with patch.object(FileResult, 'serialize', wraps=result.serialize) as serialize:
+            result.save()
+            other.get_buffer()
+
+        self.assertEqual(serialize.call_count, 1)
+        result.s3.put_object.assert_called_once_with(Bucket='bucket', Key='out.csv',
+                                                     Body=b',a\n0,1\n1,2\n')
+
+
+class DriveLookupCacheTest(TestCase):
+
+    def test_ttl(self):
+        cache = DriveLookupCache()
+        key = (None, 'parent', 'report.csv')
+        cache.set(key, {'id': 'abc'})
+
+        self.assertEqual(cache.get(key, ttl=60), {'id': 'abc'})
+        with patch('time.time', return_value=time.time() + 120):
+            self.assertIsNone(cache.get(key, ttl=60))
+
+        cache.invalidate(key)
+        self.assertIsNone(cache.get(key, ttl=60))
+
+    def test_persistence(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        os.remove(path)
+        try:
+            cache = DriveLookupCache(path)
+            cache.set(('drive', None, 'folder'), {'id': 'abc'})
+            # Writes are batched until flush
+            self.assertFalse(os.path.exists(path))
+            cache.flush()
+
+            cache = DriveLookupCache(path)
+            self.assertEqual(cache.get(('drive', None, 'folder'), ttl=60), {'id': 'abc'})
+        finally:
+            os.remove(path)
+
+    def test_unreadable_file(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.write(fd, b'{"truncated')
+        os.close(fd)
+        try:
+            cache = DriveLookupCache(path)
+            self.assertIsNone(cache.get(('drive', None, 'folder'), ttl=60))
+            cache.set(('drive', None, 'folder'), {'id': 'abc'})
+            cache.flush()
+
+            with open(path) as f:
+                self.assertEqual(len(json.load(f)), 1)
+        finally:
+            os.remove(path)
+
+    def test_loaded_files_are_checked_once(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            cache = DriveLookupCache(path)
+            cache.set(('drive', None, 'folder'), {'id': 'abc'})
+            # Files found by this process don't need to be checked
+            self.assertFalse(cache.needs_check('abc'))
+            cache.flush()
+
+            cache = DriveLookupCache(path)
+            self.assertTrue(cache.needs_check('abc'))
+            cache.mark_checked('abc')
+            self.assertFalse(cache.needs_check('abc'))
+        finally:
+            os.remove(path)
+
+    @patch.object(DriveMixin, 'is_live', return_value=True)
+    def test_find_file_checks_cached_files_once(self, is_live):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            with open(path, 'w') as f:
+                json.dump({json.dumps(['drive', None, 'folder']):
+                           {'metadata': {'id': 'abc'}, 'time': time.time()}}, f)
+            drive = DriveMixin()
+            drive.drive_id, drive.lookup_cache_file = 'drive', path
+            for _ in range(3):
+                self.assertEqual(drive.find_file('folder'), {'id': 'abc'})
+            is_live.assert_called_once_with('abc')
+        finally:
+            os.remove(path)
+
+
+class DriveClientsTest(TestCase):
+
+    def tearDown(self):
+        dispose_drive_clients()
+
+    @patch('laika.reports.create_drive', side_effect=lambda profile, grant, creds: Mock())
+    @patch('laika.reports.create_drive_credentials')
+    def test_clients_are_pooled(self, create_credentials, create_drive):
+        profile = {'name': 'drive'}
+        with checkout_drive(profile, 'me@mail.com') as client:
+            # A client is only used by one block at a time
+            with checkout_drive(profile, 'me@mail.com') as other:
+                self.assertIsNot(client, other)
+
+        reused = []
+
+        def use_client():
+            with checkout_drive(profile, 'me@mail.com') as drive:
+                reused.append(drive)
+
+        for _ in range(3):
+            thread = threading.Thread(target=use_client)
+            thread.start()
+            thread.join()
+
+        # Returned clients are reused by other threads
+        self.assertTrue(all(drive in (client, other) for drive in reused))
+        self.assertEqual(create_drive.call_count, 2)
+        self.assertEqual(create_credentials.call_count, 1)
+        with checkout_drive(profile, 'you@mail.com') as drive:
+            self.assertNotIn(drive, (client, other))
+
+
+class RecordingResult(Result):
+
+    saved = []
+    lock = threading.Lock()
+
+    def save(self):
+        time.sleep(0.01)
+        group = self.result_variables['partition_group']
+        if group == 'fail':
+            raise ValueError('failed partition')
+        with self.lock:
+            self.saved.append((group, len(self.data)))
+
+
+class PartitionedResultTest(TestCase):
+
+    def setUp(self):
+        RecordingResult.saved = []
+        self.conf = Config({'profiles': [], 'connections': [], 'reports': []})
+        self.data = pd.DataFrame({'key': ['a', 'b', 'b', 'c', 'fail'], 'value': range(5)})
+
+    def get_result(self, **kwargs):
+        return PartitionedResult(self.conf, self.data, partition_key='key',
+                                 inner_result_type='recording', **kwargs)
+
+    @patch.dict(Config._result_map, {'recording': RecordingResult})
+    def test_partitions_are_built_lazily(self):
+        result = self.get_result()
+        inner_results = result.iter_inner_results()
+        self.assertEqual(next(inner_results).data['key'].tolist(), ['a'])
+        self.assertEqual(next(inner_results).data['key'].tolist(), ['b', 'b'])
+
+    @patch.dict(Config._result_map, {'recording': RecordingResult})
+    def test_concurrent_save(self):
+        with self.assertRaises(ReportError) as ctx:
+            self.get_result(max_workers=3).save()
+        self.assertIn('1 of 4 results failed', str(ctx.exception))
+        self.assertEqual(sorted(RecordingResult.saved), [('a', 1), ('b', 2), ('c', 1)])
+
+
+class UploadToGoogleDriveTest(TestCase):
+
+    def setUp(self):
+        self.conf = Config({'profiles': [{'name': 'drive'}], 'connections': [], 'reports': []})
+        self.data = pd.DataFrame({'a': [1, 2]})
+
+    def get_result(self, **kwargs):
+        kwargs.setdefault('filename', 'out.csv')
+        return UploadToGoogleDrive(self.conf, self.data, profile='drive', grant='me@mail.com',
+                                   **kwargs)
+
+    def test_upload_shared_serialization(self):
+        cache = SerializationCache()
+        result = self.get_result(serialization_cache=cache)
+        other = FileResult(self.conf, self.data, filename='out.csv', serialization_cache=cache)
+
+        with patch.object(FileResult, 'serialize', wraps=result.serialize) as serialize:
+            with result.upload_buffer() as buf:
+                contents = buf.read()
+            other.get_buffer()
+
+        self.assertEqual(serialize.call_count, 1)
+        self.assertEqual(contents, b',a\n0,1\n1,2\n')
+
+    def test_find_files_escapes_titles(self):
+        result = self.get_result()
+        drive = Mock()
+        drive.ListFile.return_value.GetList.return_value = []
+        result._drive = drive
+        with patch.object(result, '_drive_call', lambda method, *args: method(*args)):
+            result.find_files(["Bob's report.csv", 'a\\b.csv'], 'folder')
+
+        query = drive.ListFile.call_args[0][0]['q']
+        self.assertIn("title='Bob\\'s report.csv'", query)
+        self.assertIn("title='a\\\\b.csv'", query)
+
+    @patch.object(UploadToGoogleDrive, 'drive_client')
+    @patch.object(UploadToGoogleDrive, 'find_files')
+    @patch.object(UploadToGoogleDrive, 'get_parent_file')
+    @patch.object(UploadToGoogleDrive, 'save', autospec=True)
+    def test_save_all(self, save, get_parent_file, find_files, drive_client):
+        get_parent_file.return_value = {'id': 'folder'}
+        find_files.return_value = {'b.csv': {'id': 'b'}}
+
+        def upload(result):
+            if result.get_filename() == 'c.csv':
+                raise IOError('Quota exceeded')
+        save.side_effect = upload
+        results = [self.get_result(filename=name, lookup_batch_size=2)
+                   for name in ('a.csv', 'b.csv', 'c.csv')]
+
+        with self.assertRaises(ReportError) as ctx:
+            UploadToGoogleDrive.save_all(iter(results), max_workers=2)
+
+        self.assertIn('1 of 3 files failed', str(ctx.exception))
+        self.assertEqual(save.call_count, 3)
+        # Existing files are checked once per batch
+        self.assertEqual([c[0][0] for c in find_files.call_args_list],
+                         [['a.csv', 'b.csv'], ['c.csv']])
+        self.assertEqual(results[0].existing_files, {'b.csv': {'id': 'b'}})
+        self.assertIs(results[0].rate_limiter, results[2].rate_limiter)
+
+
+class RateLimiterTest(TestCase):
+
+    def setUp(self):
+        self.sleep = patch('time.sleep').start()
+        patch('time.time', return_value=100).start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    def test_spaces_calls(self):
+        limiter = RateLimiter(rate=2)
+        for _ in range(3):
+            limiter.acquire()
+
+        self.assertEqual([c[0][0] for c in self.sleep.call_args_list], [0.5, 1])
+
+    def test_penalize_and_reward(self):
+        limiter = RateLimiter(rate=10, min_rate=1)
+        for _ in range(5):
+            limiter.penalize()
+        self.assertEqual(limiter.rate, 1)
+
+        limiter.reward()
+        self.assertEqual(limiter.rate, 2)
+        for _ in range(20):
+            limiter.reward()
+        self.assertEqual(limiter.rate, 10)
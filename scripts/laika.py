@@ -28,14 +28,17 @@ ENV_LAIKA_PWD = 'LAIKA_PWD'
 @click.option('-l', '--list', 'show_list', is_flag=True, help='list available reports')
 @click.option('--loglevel', default='INFO', help='level of log messages')
 @click.option('--pwd', required=False)
+@click.option('-w', '--workers', default=1, type=int,
+              help='number of reports to run concurrently with --all')
 @click.pass_context
-def run(ctx, report, run_all, config, show_list, loglevel, pwd):
+def run(ctx, report, run_all, config, show_list, loglevel, pwd, workers):
     """
     Runs report, specified in the config file.
 
     You can run all the listed reports, passing --all flag (don't pass report
     in this case). For the configuration, config.json is used by default, but
-    you can specify another file with --config option.
+    you can specify another file with --config option. With --workers, up to
+    that many reports are run concurrently.
     """
 
     pwd = pwd or os.environ.get(ENV_LAIKA_PWD)
@@ -47,8 +50,10 @@ def run(ctx, report, run_all, config, show_list, loglevel, pwd):
         config = os.path.join(pwd, 'config.json')
         click.secho('Config file not specified, running with example configuration!', fg='yellow')
 
-    logging.basicConfig(format='[%(asctime)s] %(name)s:%(levelname)s - %(message)s',
+    logging.basicConfig(format='[%(asctime)s] %(name)s:%(levelname)s [%(report)s] - %(message)s',
                         stream=sys.stdout, level=getattr(logging, loglevel), datefmt='%Y-%m-%d %H:%M:%S')
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(laika.ReportNameFilter())
 
     conf = laika.Config(config, pwd)
 
@@ -66,13 +71,13 @@ def run(ctx, report, run_all, config, show_list, loglevel, pwd):
 
     conf.overwrite_attributes(extra_args)
 
-    runner = laika.Runner(conf, **extra_args)
-    if report:
-        runner.run_report(report)
-    elif run_all:
-        runner.run()
-    else:
-        click.echo('Please, specify the report to run. Run with -h to see help message.')
+    with laika.Runner(conf, workers=workers, **extra_args) as runner:
+        if report:
+            runner.run_report(report)
+        elif run_all:
+            runner.run()
+        else:
+            click.echo('Please, specify the report to run. Run with -h to see help message.')
 
 
 if __name__ == '__main__':
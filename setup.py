@@ -27,8 +27,11 @@ googleads = ['google-ads==15.0.0']
 s3 = ['boto3==1.14.3']
 sftp = ['paramiko==2.6.0']
 bingads = ['bingads==13.0.10']
+parquet = ['pyarrow==0.17.1']
+zstd = ['zstandard==0.15.2']
 
-all_reports = excel + postgres + presto + drive + adwords + s3 + sftp + bingads + googleads
+all_reports = (excel + postgres + presto + drive + adwords + s3 + sftp + bingads + googleads +
+               parquet + zstd)
 
 test = ['mock==1.3.0']
 docs = ['Sphinx>=1.7.1', 'sphinx-rtd-theme>=0.2.4']
@@ -75,6 +78,8 @@ setup(
         's3': s3,
         'sftp': sftp,
         'bingads': bingads,
+        'parquet': parquet,
+        'zstd': zstd,
 
         'all_reports': all_reports,
 